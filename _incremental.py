@@ -0,0 +1,94 @@
+"""Incremental execution of the modules of a network channel.
+
+Memoryless modules are only processed if the output of one of their input
+modules changed in the tick, otherwise their previous output is reused.
+Modules of channel types that are not declared memoryless are processed on
+every tick to advance their state. The first module is skipped if it is
+memoryless and the input of the network did not change.
+"""
+from .channels import is_memoryless
+from ._network import _NetworkChannel, _empty_channel, _network_output, _send_each
+
+#Types of outputs that can not be updated in place, interned or cached
+#objects of these types are compared by equal
+_IMMUTABLE = (bool, int, float, complex, str, bytes, type(None))
+
+def incremental_network_channel(plan, equal=None):
+    """Returns an initialized network channel that only processes the memoryless modules of the plan whose inputs changed.
+    
+    The channel behaves like compiled_network_channel in modular._network.
+    An input of the network is unchanged if it is the previous input or if
+    equal returns True for the previous and the current input. The output of
+    a processed module is unchanged if equal returns True for its previous and
+    its current output. Without equal each processed module counts as changed.
+    An output that is the previous output object counts as changed, since it
+    may be updated in place, unless it is an immutable bool, number, string,
+    bytes or None. Blocks are processed input by input.
+    
+    """
+    if not plan.channels:
+        return _empty_channel()
+    
+    return _IncrementalNetworkChannel(plan, equal)
+
+class _IncrementalNetworkChannel(_NetworkChannel):
+    def __init__(self, plan, equal):
+        super().__init__(plan)
+        self._equal = equal
+        self._first_memoryless = is_memoryless(plan.channels[0])
+        self._incremental_steps = tuple((slot, send, input_slots, is_memoryless(plan.channels[slot]))
+                                        for slot, send, input_slots in self._steps)
+        self._changed = [True] * len(self._channels)
+        self._input = None
+        self._started = False
+    
+    def send(self, input_):
+        outputs, changed, started = self._outputs, self._changed, self._started
+        
+        if started and self._first_memoryless and self.__same_input(input_):
+            changed[0] = False
+        else:
+            changed[0] = self.__process(0, self._first_send, input_)
+        self._input = input_
+        
+        for slot, send, input_slots, memoryless in self._incremental_steps:
+            if started and memoryless:
+                for input_slot in input_slots:
+                    if changed[input_slot]:
+                        break
+                else:
+                    changed[slot] = False
+                    continue
+            
+            changed[slot] = self.__process(slot, send, [outputs[input_slot] for input_slot in input_slots])
+        
+        self._started = True
+        
+        return _network_output(outputs, self._output_slots)
+    
+    def send_many(self, inputs):
+        return _send_each(self.send, inputs, self._output_slots)
+    
+    def restore(self, state):
+        super().restore(state)
+        
+        #The outputs of the memoryless modules are recomputed on the next tick
+        self._started = False
+    
+    def __same_input(self, input_):
+        previous = self._input
+        
+        return input_ is previous or (self._equal is not None and self._equal(previous, input_))
+    
+    def __process(self, slot, send, module_input):
+        #Returns whether the output of the module changed
+        previous = self._outputs[slot]
+        output = self._outputs[slot] = send(module_input)
+        
+        if not self._started or self._equal is None:
+            return True
+        
+        if output is previous and not isinstance(output, _IMMUTABLE):
+            return True
+        
+        return not self._equal(previous, output)
@@ -0,0 +1,110 @@
+"""Lazy execution of the modules of a network channel.
+
+Modules are processed when their output is first needed during a tick and
+the output is kept for the rest of the tick. Modules of channel types that
+are not declared memoryless are processed on every tick to advance their
+state, memoryless modules whose output is never read are skipped. Modules of
+channel types declared with lazy inputs receive a sequence that processes
+an input module when the input is read, so gates and selectors only process
+the branches they select.
+"""
+from .channels import is_memoryless, is_lazy_inputs
+from ._network import _NetworkChannel, _empty_channel, _send_each
+
+_PENDING = object()
+
+def lazy_network_channel(plan):
+    """Returns an initialized network channel that processes the modules of the given plan on demand.
+    
+    The channel behaves like compiled_network_channel in modular._network,
+    except that memoryless modules whose outputs are not needed are not
+    processed. Blocks are processed input by input.
+    
+    """
+    if not plan.channels:
+        return _empty_channel()
+    
+    return _LazyNetworkChannel(plan)
+
+class _LazyNetworkChannel(_NetworkChannel):
+    def __init__(self, plan):
+        super().__init__(plan)
+        self._sends = [channel.send for channel in self._channels]
+        self._inputs = plan.inputs
+        self._lazy = [is_lazy_inputs(channel) for channel in plan.channels]
+        self._stateful = [slot for slot, channel in enumerate(plan.channels) if not is_memoryless(channel)]
+        self._last = len(plan.channels) - 1
+        self._input = None
+    
+    def send(self, input_):
+        self._input = input_
+        self._outputs = [_PENDING] * len(self._outputs)
+        
+        value = self._value
+        for slot in self._stateful:
+            value(slot)
+        
+        if self._output_slots is None:
+            return value(self._last)
+        
+        return tuple(value(slot) for slot in self._output_slots)
+    
+    def send_many(self, inputs):
+        return _send_each(self.send, inputs, self._output_slots)
+    
+    def _value(self, slot):
+        outputs = self._outputs
+        if outputs[slot] is not _PENDING:
+            return outputs[slot]
+        
+        #Collects the pending modules the module depends on without recursion,
+        #modules with lazy inputs process their inputs when they read them
+        needed, pending = set(), [slot]
+        while pending:
+            needed_slot = pending.pop()
+            if needed_slot in needed or outputs[needed_slot] is not _PENDING:
+                continue
+            needed.add(needed_slot)
+            if not self._lazy[needed_slot]:
+                pending.extend(self._inputs[needed_slot])
+        
+        #Slots are in topological order, a module read by a module with lazy
+        #inputs may already be processed
+        for needed_slot in sorted(needed):
+            if outputs[needed_slot] is _PENDING:
+                outputs[needed_slot] = self._sends[needed_slot](self.__module_input(needed_slot))
+        
+        return outputs[slot]
+    
+    def __module_input(self, slot):
+        if not slot:
+            return self._input
+        
+        if self._lazy[slot]:
+            return _LazyInputs(self, self._inputs[slot])
+        
+        outputs = self._outputs
+        
+        return [outputs[input_slot] for input_slot in self._inputs[slot]]
+
+class _LazyInputs():
+    """The outputs of the input modules of a module, processed when read."""
+    __slots__ = ("_network", "_slots")
+    
+    def __init__(self, network, slots):
+        self._network = network
+        self._slots = slots
+    
+    def __len__(self):
+        return len(self._slots)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._network._value(slot) for slot in self._slots[index]]
+        
+        return self._network._value(self._slots[index])
+    
+    def __iter__(self):
+        value = self._network._value
+        
+        return (value(slot) for slot in self._slots)
@@ -1,15 +1,21 @@
 """A Module represents a named processing channel."""
 class Module():
-    def __init__(self, id_, channel):
-        """Initialize a new instance from an id and a channel type, channel or initialized channel."""
+    def __init__(self, id_, channel, cache_size=None):
+        """Initialize a new instance from an id and a channel type, channel or initialized channel.
+        
+        If cache_size is not None, the outputs of the module are cached for
+        that many distinct inputs.
+        
+        """
         self.id = id_
         self.channel = channel
+        self.cache_size = cache_size
     
     def get_state(self):
         return self.id, self.channel
 
     def _start(self):
-        return Module(self.id, self.channel())
+        return Module(self.id, self.channel(), self.cache_size)
     
     def __eq__(self, other):
         if self is other:
@@ -1,16 +1,29 @@
 """Composite network channel from modules and connections."""
+from collections import namedtuple
 from functools import partial
-from .channels import memoryless_channel
+from .channels import send_many, snapshot, restore, Channel
+
+_Plan = namedtuple("_Plan", ("ids", "channels", "inputs", "outputs"), defaults=(None, ))
 
 def network_channel(modules, connections):
     if not modules:
         return _empty_channel()
 
     started_modules = [module._start() for module in modules]
-    process = partial(_process_modules, modules=started_modules, connections=connections)
     
     #The state of the network is confined in the started modules
-    return memoryless_channel(process)
+    return _InterpretedNetworkChannel(started_modules, connections)
+
+class _InterpretedNetworkChannel(Channel):
+    def __init__(self, modules, connections):
+        self._modules = modules
+        self.send = partial(_process_modules, modules=modules, connections=connections)
+        
+    def snapshot(self):
+        return _snapshot_network([module.id for module in self._modules], [module.channel for module in self._modules])
+    
+    def restore(self, state):
+        _restore_network([module.id for module in self._modules], [module.channel for module in self._modules], state)
     
 def _process_modules(input_, modules, connections):
     #Modules are procesed in the order of their definition. This is
@@ -35,6 +48,171 @@ def _process_module(module, outputs, connections):
     
     return channel.send(input_values)
 
+def compile_network(modules, connections, output_ids=None):
+    """Returns an execution plan for the given modules and connections.
+    
+    The plan replaces the module ids by the index (slot) of the module in the
+    definition order and stores for each module the tuple of slots of its
+    input modules. It is computed once and can be started any number of times
+    by compiled_network_channel.
+    
+    If output_ids is None the network outputs the value of the last module,
+    otherwise a tuple with the values of the modules with the given ids.
+    
+    """
+    slots = {module.id: slot for slot, module in enumerate(modules)}
+    inputs = tuple(tuple(slots[input_id] for input_id in connections.get(module.id, ()))
+                   for module in modules)
+    outputs = None if output_ids is None else tuple(slots[output_id] for output_id in output_ids)
+    
+    return _Plan(tuple(module.id for module in modules),
+                 tuple(module.channel for module in modules),
+                 inputs,
+                 outputs)
+
+def prune_network(modules, connections, output_ids):
+    """Returns the modules and connections that influence the modules with the given ids.
+    
+    The first module is always kept, since it receives the input of the
+    network.
+    
+    """
+    live = set(output_ids)
+    for module in reversed(modules):
+        if module.id in live:
+            live.update(connections.get(module.id, ()))
+    live.add(modules[0].id)
+    
+    return ([module for module in modules if module.id in live],
+            {module_id: inputs for module_id, inputs in connections.items() if module_id in live})
+
+def merge_network(modules, connections, mergeable):
+    """Returns the modules and connections with duplicate modules merged.
+    
+    Modules are duplicates if mergeable returns True for them and they have
+    the same channel and the same input modules. Each duplicate is replaced by
+    the first module it duplicates. Also returns the mapping from the ids of
+    the replaced modules to the ids of the modules replacing them.
+    
+    The first module is never merged, since it receives the input of the
+    network.
+    
+    """
+    replaced = {}
+    merged_modules = [modules[0]]
+    merged_connections = {}
+    known = {}
+    for module in modules[1:]:
+        inputs = tuple(replaced.get(input_id, input_id) for input_id in connections.get(module.id, ()))
+        if mergeable(module):
+            key = (module.channel, inputs)
+            if key in known:
+                replaced[module.id] = known[key]
+                continue
+            
+            known[key] = module.id
+        
+        merged_modules.append(module)
+        if inputs:
+            merged_connections[module.id] = inputs
+    
+    return merged_modules, merged_connections, replaced
+
+def compiled_network_channel(plan):
+    """Returns an initialized network channel that executes the given plan.
+    
+    The channel behaves like network_channel, except that the inputs of a
+    module are passed as a list of the outputs of its input modules.
+    
+    The state of the channel is exported and restored by snapshot and restore
+    (See also modular.channels.snapshot), if all module channels support it.
+    The state holds the state of each module with the module ids.
+    
+    If the plan has output slots, the channel returns the tuple of the
+    outputs of these modules, and for a block the tuple of their output
+    blocks. The outputs are taken from the values computed anyway.
+    
+    In addition the channel processes blocks of inputs via its send_many
+    method: each module in turn processes the block of its inputs, using the
+    native block processing of the module channels where available. Since
+    connections only lead from earlier to later modules, the results are the
+    same as for sample by sample processing.
+    
+    """
+    if not plan.channels:
+        return _empty_channel()
+
+    return _NetworkChannel(plan)
+
+class _NetworkChannel(Channel):
+    def __init__(self, plan):
+        #The state of the network is confined in the started channels, the
+        #outputs are overwritten on each call
+        self._channels = [channel() for channel in plan.channels]
+        self._ids = plan.ids
+        self._outputs = [None] * len(self._channels)
+        self._output_slots = plan.outputs
+        
+        sends = [channel.send for channel in self._channels]
+        self._first_send = sends[0]
+        self._steps = tuple(zip(range(1, len(sends)), sends[1:], plan.inputs[1:]))
+        self._block_steps = tuple(zip(range(1, len(sends)), self._channels[1:], plan.inputs[1:]))
+        
+    def send(self, input_):
+        outputs = self._outputs
+        outputs[0] = self._first_send(input_)
+        
+        for slot, send, input_slots in self._steps:
+            outputs[slot] = send([outputs[input_slot] for input_slot in input_slots])
+        
+        return _network_output(outputs, self._output_slots)
+    
+    def send_many(self, inputs):
+        outputs = [None] * len(self._channels)
+        outputs[0] = send_many(self._channels[0], inputs)
+        no_inputs = [()] * len(inputs)
+        
+        for slot, channel, input_slots in self._block_steps:
+            module_inputs = list(zip(*(outputs[input_slot] for input_slot in input_slots))) if input_slots else no_inputs
+            outputs[slot] = send_many(channel, module_inputs)
+        
+        return _network_output(outputs, self._output_slots)
+
+    def snapshot(self):
+        return _snapshot_network(self._ids, self._channels)
+    
+    def restore(self, state):
+        _restore_network(self._ids, self._channels, state)
+        
+    def cache_info(self):
+        return {module_id: channel.cache_info() for module_id, channel in zip(self._ids, self._channels)
+                if hasattr(channel, "cache_info")}
+
+def _snapshot_network(ids, channels):
+    return {"ids": list(ids), "modules": [snapshot(channel) for channel in channels]}
+
+def _restore_network(ids, channels, state):
+    if list(state["ids"]) != list(ids):
+        raise ValueError("The state is not a state of a network with the modules {0}".format(list(ids)))
+    
+    for channel, channel_state in zip(channels, state["modules"]):
+        restore(channel, channel_state)
+
+def _network_output(outputs, output_slots):
+    if output_slots is None:
+        return outputs[-1]
+    
+    return tuple(outputs[slot] for slot in output_slots)
+
+def _send_each(send, inputs, output_slots):
+    #Processes a block input by input, with selected outputs as a tuple of
+    #output blocks like the send_many of _NetworkChannel
+    outputs = [send(input_) for input_ in inputs]
+    if output_slots is None:
+        return outputs
+    
+    return tuple([output[i] for output in outputs] for i in range(len(output_slots)))
+
 def _empty_channel():
     empty = (None for _ in range(2))
     next(empty)
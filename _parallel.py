@@ -0,0 +1,249 @@
+"""Concurrent execution of the modules of a network channel.
+
+The modules are grouped into topological levels, a module is in the level
+following the highest level of its input modules. The modules of a level
+only depend on modules of lower levels and are processed concurrently.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+from itertools import repeat
+from os import cpu_count
+import multiprocessing
+from .channels import send_many, Channel
+from .async_channels import async_channel
+from ._network import _empty_channel, _network_output, _snapshot_network, _restore_network
+
+def network_levels(plan):
+    """Returns the slots of the modules in the plan grouped by topological level."""
+    levels = []
+    for input_slots in plan.inputs:
+        levels.append(max((levels[slot] for slot in input_slots), default=-1) + 1)
+    
+    grouped = [[] for _ in range(max(levels, default=-1) + 1)]
+    for slot, level in enumerate(levels):
+        grouped[level].append(slot)
+    
+    return tuple(tuple(slots) for slots in grouped)
+
+def threaded_network_channel(plan, workers=None):
+    """Returns an initialized network channel that processes each level in a thread pool.
+    
+    Threads are beneficial for modules that release the GIL, e.g. for
+    operations on large arrays or in block processing.
+    
+    """
+    if not plan.channels:
+        return _empty_channel()
+    
+    return _ThreadedNetworkChannel(plan, workers)
+
+def process_network_channel(plan, workers=None):
+    """Returns an initialized network channel that processes each level in worker processes.
+    
+    Each module is started in and stays with one of the worker processes,
+    only the inputs and outputs of the modules are transferred. The channel
+    functions of the plan must be picklable and the workers must be
+    terminated by calling the close method of the channel.
+    
+    """
+    if not plan.channels:
+        return _empty_channel()
+    
+    return _ProcessNetworkChannel(plan, workers)
+
+def async_network_channel(plan):
+    """Returns an initialized async network channel that awaits the async modules of each level concurrently.
+    
+    Modules with an async channel, that is a channel with an asend method,
+    are awaited concurrently via asyncio.gather, all other modules are
+    processed by their send method. The returned channel is an async channel
+    (See also modular.async_channels).
+    
+    """
+    if not plan.channels:
+        return async_channel(_empty_channel())
+    
+    return _AsyncNetworkChannel(plan)
+
+class _ParallelNetworkChannel(Channel):
+    def __init__(self, plan):
+        self._inputs = plan.inputs
+        self._output_slots = plan.outputs
+        self._levels = network_levels(plan)
+        
+    def send(self, input_):
+        return self.__process(input_, False, _sample_inputs)
+    
+    def send_many(self, inputs):
+        no_inputs = [()] * len(inputs)
+        
+        return self.__process(inputs, True, lambda outputs, input_slots: _block_inputs(outputs, input_slots, no_inputs))
+    
+    def __process(self, input_, block, module_inputs):
+        outputs = [None] * len(self._inputs)
+        for level in self._levels:
+            tasks = [(slot, input_ if not slot else module_inputs(outputs, self._inputs[slot])) for slot in level]
+            for slot, output in zip(level, self._execute(tasks, block)):
+                outputs[slot] = output
+        
+        return _network_output(outputs, self._output_slots)
+    
+def _sample_inputs(outputs, input_slots):
+    return [outputs[input_slot] for input_slot in input_slots]
+
+def _block_inputs(outputs, input_slots, no_inputs):
+    if not input_slots:
+        return no_inputs
+    
+    return list(zip(*(outputs[input_slot] for input_slot in input_slots)))
+
+def _process_task(channels, task, block):
+    key, inputs = task
+    
+    return send_many(channels[key], inputs) if block else channels[key].send(inputs)
+
+class _ThreadedNetworkChannel(_ParallelNetworkChannel):
+    def __init__(self, plan, workers):
+        super().__init__(plan)
+        self._ids = plan.ids
+        self._channels = [channel() for channel in plan.channels]
+        self._pool = ThreadPoolExecutor(workers)
+        
+    def _execute(self, tasks, block):
+        if len(tasks) == 1:
+            return [_process_task(self._channels, tasks[0], block)]
+        
+        return self._pool.map(_process_task, repeat(self._channels), tasks, repeat(block))
+    
+    def snapshot(self):
+        return _snapshot_network(self._ids, self._channels)
+    
+    def restore(self, state):
+        _restore_network(self._ids, self._channels, state)
+    
+    def close(self):
+        self._pool.shutdown()
+
+class _ProcessNetworkChannel(_ParallelNetworkChannel):
+    def __init__(self, plan, workers):
+        super().__init__(plan)
+        workers = min(workers or cpu_count(), max(len(level) for level in self._levels))
+        
+        #The modules of each level are distributed evenly over the workers
+        self._owners = [0] * len(plan.channels)
+        for level in self._levels:
+            for i, slot in enumerate(level):
+                self._owners[slot] = i % workers
+        
+        channels = [{} for _ in range(workers)]
+        for slot, owner in enumerate(self._owners):
+            channels[owner][slot] = plan.channels[slot]
+        self._pool = WorkerPool(channels)
+        
+    def _execute(self, tasks, block):
+        worker_tasks = [[] for _ in range(len(self._pool))]
+        for task in tasks:
+            worker_tasks[self._owners[task[0]]].append(task)
+        
+        results = {}
+        for assigned, outputs in zip(worker_tasks, self._pool.execute(worker_tasks, block)):
+            results.update(zip((slot for slot, _ in assigned), outputs))
+        
+        return [results[slot] for slot, _ in tasks]
+    
+    def close(self):
+        self._pool.close()
+
+class _AsyncNetworkChannel():
+    def __init__(self, plan):
+        self._inputs = plan.inputs
+        self._output_slots = plan.outputs
+        self._levels = network_levels(plan)
+        self._channels = [channel() for channel in plan.channels]
+        
+    async def asend(self, input_):
+        outputs = [None] * len(self._channels)
+        for level in self._levels:
+            pending_slots, pending = [], []
+            for slot in level:
+                channel = self._channels[slot]
+                module_input = input_ if not slot else _sample_inputs(outputs, self._inputs[slot])
+                if hasattr(channel, "asend"):
+                    pending_slots.append(slot)
+                    pending.append(channel.asend(module_input))
+                else:
+                    outputs[slot] = channel.send(module_input)
+            
+            if pending:
+                for slot, output in zip(pending_slots, await asyncio.gather(*pending)):
+                    outputs[slot] = output
+        
+        return _network_output(outputs, self._output_slots)
+
+class WorkerPool():
+    """Worker processes that each start and keep a set of channels.
+    
+    The channels are given as one mapping from keys to channel functions
+    per worker. Tasks for a worker are pairs of a key and the input for the
+    channel of that key.
+    
+    """
+    def __init__(self, channels):
+        self._connections = []
+        self._processes = []
+        for worker_channels in channels:
+            connection, worker_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_worker, args=(worker_connection, worker_channels), daemon=True)
+            process.start()
+            self._connections.append(connection)
+            self._processes.append(process)
+            
+    def __len__(self):
+        return len(self._connections)
+    
+    def execute(self, worker_tasks, block):
+        """Returns the list of outputs for the list of tasks of each worker.
+        
+        The tasks of all workers are processed concurrently. The outputs are
+        computed by send_many if block is true, otherwise by send. If a
+        worker fails, the first error is raised after the replies of all
+        workers are received, so that no reply is left for the next call.
+        
+        """
+        for connection, tasks in zip(self._connections, worker_tasks):
+            if tasks:
+                connection.send((tasks, block))
+        
+        replies = [connection.recv() if tasks else [] for connection, tasks in zip(self._connections, worker_tasks)]
+        
+        return [_result(reply) for reply in replies]
+    
+    def close(self):
+        """Terminates the worker processes."""
+        for connection, process in zip(self._connections, self._processes):
+            connection.send(None)
+            process.join()
+            connection.close()
+        
+        self._connections = []
+        self._processes = []
+
+def _worker(connection, channels):
+    started = {key: channel() for key, channel in channels.items()}
+    
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        
+        tasks, block = message
+        try:
+            connection.send([_process_task(started, task, block) for task in tasks])
+        except Exception as error:
+            connection.send(error)
+
+def _result(value):
+    if isinstance(value, Exception):
+        raise value
+    
+    return value
@@ -0,0 +1,128 @@
+"""Per module statistics of network channels."""
+from array import array
+from random import Random
+from time import perf_counter
+import json
+import numpy as np
+from .channels import send_many
+from ._network import _NetworkChannel, _empty_channel, _network_output
+
+class NetworkStats():
+    """Collects per module statistics of profiled network channels.
+    
+    For each module id the number of calls, the number of processed inputs,
+    the wall time of the calls and the number of input modules (fan-in) are
+    recorded. Percentiles of the call times are computed from a uniform
+    sample of at most max_samples calls per module.
+    
+    """
+    def __init__(self, max_samples=10000):
+        self.__max_samples = max_samples
+        self.__random = Random(0)
+        self.__fan_in = {}
+        self.__calls = {}
+        self.__inputs = {}
+        self.__total_time = {}
+        self.__times = {}
+        
+    def _register(self, module_id, fan_in):
+        if module_id not in self.__calls:
+            self.__fan_in[module_id] = fan_in
+            self.__calls[module_id] = 0
+            self.__inputs[module_id] = 0
+            self.__total_time[module_id] = 0.0
+            self.__times[module_id] = array("d")
+    
+    def _record(self, module_id, seconds, inputs):
+        calls = self.__calls[module_id] + 1
+        self.__calls[module_id] = calls
+        self.__inputs[module_id] += inputs
+        self.__total_time[module_id] += seconds
+        
+        #Reservoir sampling of the call times
+        times = self.__times[module_id]
+        if len(times) < self.__max_samples:
+            times.append(seconds)
+        else:
+            index = self.__random.randrange(calls)
+            if index < self.__max_samples:
+                times[index] = seconds
+    
+    def module_ids(self):
+        """Returns a list of the ids of the profiled modules."""
+        return list(self.__calls)
+    
+    def summary(self, percentiles=(50, 90, 99)):
+        """Returns a dictionary from module ids to a dictionary of statistics.
+        
+        The statistics are the fan_in, the number of calls and inputs, the
+        total_time and the given percentiles of the call time in seconds as
+        "p50" etc.
+        
+        """
+        summary = {}
+        for module_id, calls in self.__calls.items():
+            times = self.__times[module_id]
+            values = np.percentile(times, percentiles) if len(times) else [0.0] * len(percentiles)
+            statistics = {"fan_in": self.__fan_in[module_id],
+                          "calls": calls,
+                          "inputs": self.__inputs[module_id],
+                          "total_time": self.__total_time[module_id]}
+            statistics.update(("p{0:g}".format(q), float(value)) for q, value in zip(percentiles, values))
+            summary[module_id] = statistics
+        
+        return summary
+    
+    def dump(self, file):
+        """Writes the summary as JSON to the given file object, module ids are converted to strings."""
+        json.dump({str(module_id): statistics for module_id, statistics in self.summary().items()}, file, indent=2)
+
+def profiled_network_channel(plan, stats):
+    """Returns an initialized network channel that records the time of each module in stats.
+    
+    The channel behaves like compiled_network_channel in modular._network.
+    
+    """
+    if not plan.channels:
+        return _empty_channel()
+    
+    return _ProfiledNetworkChannel(plan, stats)
+
+class _ProfiledNetworkChannel(_NetworkChannel):
+    def __init__(self, plan, stats):
+        super().__init__(plan)
+        self._stats = stats
+        for module_id, input_slots in zip(plan.ids, plan.inputs):
+            stats._register(module_id, len(input_slots))
+            
+    def send(self, input_):
+        outputs, ids, record = self._outputs, self._ids, self._stats._record
+        
+        start = perf_counter()
+        outputs[0] = self._first_send(input_)
+        record(ids[0], perf_counter() - start, 1)
+        
+        for slot, send, input_slots in self._steps:
+            module_input = [outputs[input_slot] for input_slot in input_slots]
+            start = perf_counter()
+            outputs[slot] = send(module_input)
+            record(ids[slot], perf_counter() - start, 1)
+        
+        return _network_output(outputs, self._output_slots)
+    
+    def send_many(self, inputs):
+        ids, record = self._ids, self._stats._record
+        
+        start = perf_counter()
+        outputs = [None] * len(self._channels)
+        outputs[0] = send_many(self._channels[0], inputs)
+        record(ids[0], perf_counter() - start, len(inputs))
+        no_inputs = [()] * len(inputs)
+        
+        for slot, channel, input_slots in self._block_steps:
+            module_inputs = list(zip(*(outputs[input_slot] for input_slot in input_slots))) if input_slots else no_inputs
+            start = perf_counter()
+            outputs[slot] = send_many(channel, module_inputs)
+            record(ids[slot], perf_counter() - start, len(inputs))
+        
+        return _network_output(outputs, self._output_slots)
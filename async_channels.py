@@ -0,0 +1,82 @@
+"""Input processing units for asyncio.
+
+An async channel is an initialized object with a coroutine method asend,
+which processes the input like the send method of a channel:
+
+>>> initialized_channel = some_async_channel()
+>>> output = await initialized_channel.asend(input)
+
+Network channels with async modules are created by a NetworkFactory with
+the "async" executor, the modules of a topological level are awaited
+concurrently.
+
+async_channel -- adapt an initialized channel to the async protocol
+async_memoryless_channel -- process consecutive inputs independently by a coroutine function
+async_start -- decorator to create async channels from async generator functions
+
+See also modular.channels.channels
+
+"""
+from ._util import identity
+
+
+def async_channel(channel):
+    """Returns an async channel that processes its inputs by the given initialized channel."""
+    return _AsyncChannel(channel)
+
+
+class _AsyncChannel():
+    def __init__(self, channel):
+        self._send = channel.send
+        
+    async def asend(self, value):
+        return self._send(value)
+
+
+def async_memoryless_channel(operation = identity):
+    """Returns an async channel that processes its inputs independently and returns the output immediately.
+    
+    Keyword arguments:
+    
+    operation -- a function or a coroutine function that operates on the inputs to the channel (default identity)
+    
+    """
+    return _AsyncMemorylessChannel(operation)
+
+
+class _AsyncMemorylessChannel():
+    def __init__(self, operation):
+        self._operation = operation
+        
+    async def asend(self, value):
+        output = self._operation(value)
+        if hasattr(output, "__await__"):
+            output = await output
+        
+        return output
+
+
+def async_start(async_generator_function):
+    """Decorator that creates an async channel from an async generator function.
+    
+    Like start in modular.channels.channels, the first input is sent to the
+    generator after it is advanced to its first yield statement.
+    
+    """
+    def wrapper(*args, **kwargs):
+        return _AsyncGeneratorChannel(async_generator_function(*args, **kwargs))
+    
+    return wrapper
+
+
+class _AsyncGeneratorChannel():
+    def __init__(self, generator):
+        self._generator = generator
+        self._started = False
+        
+    async def asend(self, value):
+        if not self._started:
+            await self._generator.asend(None)
+            self._started = True
+        
+        return await self._generator.asend(value)
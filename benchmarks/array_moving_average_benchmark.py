@@ -0,0 +1,34 @@
+"""Throughput of the array moving average against a window of separate arrays.
+
+The channels are created without the sum stage for multiple inputs.
+
+Run from the directory containing the package, e.g.:
+
+    python -m channel.benchmarks.array_moving_average_benchmark
+
+"""
+from timeit import repeat
+from .. import array_channels, numeric_channels
+import numpy as np
+
+N = 256
+WIDTHS = (16, 1024, 16384)
+TICKS = 500
+
+def ticks_per_second(channel, inputs):
+    send = channel.send
+    seconds = min(repeat(lambda: [send(input_) for input_ in inputs], number=1, repeat=3))
+    
+    return len(inputs) / seconds
+
+def main():
+    print("{0:>8} {1:>16} {2:>16} {3:>16}".format("width", "list [1/s]", "array [1/s]", "array, out [1/s]"))
+    for width in WIDTHS:
+        inputs = list(np.random.random((TICKS, width)))
+        window_list = ticks_per_second(numeric_channels._single_input_moving_average_channel(N, operation=np.asarray), inputs)
+        window_array = ticks_per_second(array_channels._single_input_moving_average_channel(N), inputs)
+        output_array = ticks_per_second(array_channels._single_input_moving_average_channel(N, out=np.empty(width)), inputs)
+        print("{0:>8} {1:>16.0f} {2:>16.0f} {3:>16.0f}".format(width, window_list, window_array, output_array))
+
+if __name__ == "__main__":
+    main()
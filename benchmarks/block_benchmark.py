@@ -0,0 +1,36 @@
+"""Throughput of sample by sample and block processing of built-in channels.
+
+Run from the directory containing the package, e.g.:
+
+    python -m channel.benchmarks.block_benchmark
+
+"""
+from timeit import repeat
+from ..channels import shift_channel, send_many
+from ..numeric_channels import _single_input_moving_average_channel
+from .. import array_channels, numeric_channels
+import numpy as np
+
+BLOCK_LENGTH = 10000
+
+CHANNELS = (("numeric moving average", lambda: _single_input_moving_average_channel(16), np.random.random(BLOCK_LENGTH)),
+            ("numeric moving average (multi input)", lambda: numeric_channels.moving_average_channel(16), list(np.random.random(BLOCK_LENGTH))),
+            ("array moving average", lambda: array_channels.moving_average_channel(16), np.random.random((BLOCK_LENGTH, 8))),
+            ("shift", lambda: shift_channel(16), list(range(BLOCK_LENGTH))))
+
+def samples_per_second(process, inputs):
+    seconds = min(repeat(lambda: process(inputs), number=1, repeat=3))
+    
+    return len(inputs) / seconds
+
+def main():
+    print("{0:>38} {1:>16} {2:>16} {3:>8}".format("channel", "send [1/s]", "send_many [1/s]", "speedup"))
+    for name, create_channel, inputs in CHANNELS:
+        send = create_channel().send
+        per_sample = samples_per_second(lambda block: [send(input_) for input_ in block], inputs)
+        channel = create_channel()
+        per_block = samples_per_second(lambda block: send_many(channel, block), inputs)
+        print("{0:>38} {1:>16.0f} {2:>16.0f} {3:>8.1f}".format(name, per_sample, per_block, per_block / per_sample))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Per call time and memory of the class based built-in channels against generators.
+
+The generator versions are the former generator implementations of the
+channels, started by the start decorator and composed by a memoryless channel
+of the composed send methods.
+
+Run from the directory containing the package, e.g.:
+
+    python -m channel.benchmarks.class_channel_benchmark
+
+"""
+from functools import partial
+from timeit import repeat
+import tracemalloc
+from .. import channels, numeric_channels, string_channels
+from .._util import compose, identity, start
+import numpy as np
+
+SAMPLES = 20000
+INSTANCES = 1000
+
+@start
+def generator_memoryless_channel(operation=identity):
+    processed_value = None
+    while True:
+        value = (yield processed_value)
+        processed_value = operation(value)
+
+@start
+def generator_shift_channel(n, initial_values=(), operation=identity, zero_val=None):
+    length = n + 1
+    buffer_ = [zero_val] * (n - len(initial_values)) + list(initial_values) + [zero_val]
+    count = n
+    while True:
+        buffer_[count] = operation((yield buffer_[count]))
+        count = (count + 1) % length
+
+@start
+def generator_moving_average_channel(n):
+    buffer = [0] * n
+    count = 0
+    mean = np.mean(buffer, axis=0)
+    while True:
+        input_ = (yield mean)
+        mean = mean + (input_ - buffer[count]) / n
+        buffer[count] = input_
+        count = (count + 1) % n
+
+def generator_concatenate(channel_1, channel_2):
+    def generator_function():
+        return generator_memoryless_channel(compose(channel_2().send, channel_1().send))
+    
+    return generator_function
+
+CHANNELS = (("memoryless", partial(generator_memoryless_channel, numeric_channels._sum), numeric_channels.sum_channel, (1, 2)),
+            ("shift", partial(generator_shift_channel, 4), partial(channels.shift_channel, 4), 1),
+            ("moving average", generator_concatenate(partial(generator_memoryless_channel, numeric_channels._sum), partial(generator_moving_average_channel, 16)),
+             partial(numeric_channels.moving_average_channel, 16), 1.5),
+            ("string delay", generator_concatenate(partial(generator_memoryless_channel, string_channels._sum), partial(generator_shift_channel, 1, ["hello"])),
+             string_channels.delay_channel, "one"))
+
+def seconds_per_call(channel_function, input_):
+    send = channel_function().send
+    
+    return min(repeat(lambda: [send(input_) for _ in range(SAMPLES)], number=1, repeat=3)) / SAMPLES
+
+def bytes_per_instance(channel_function, input_):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    started = [channel_function() for _ in range(INSTANCES)]
+    for channel in started:
+        channel.send(input_)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    
+    return sum(stat.size_diff for stat in after.compare_to(before, "filename")) / INSTANCES
+
+def main():
+    print("{0:>16} {1:>16} {2:>12} {3:>16} {4:>12}".format("channel", "generator [ns]", "class [ns]", "generator [B]", "class [B]"))
+    for name, generator_function, channel_function, input_ in CHANNELS:
+        print("{0:>16} {1:>16.0f} {2:>12.0f} {3:>16.0f} {4:>12.0f}".format(name,
+                                                                           seconds_per_call(generator_function, input_) * 1e9,
+                                                                           seconds_per_call(channel_function, input_) * 1e9,
+                                                                           bytes_per_instance(generator_function, input_),
+                                                                           bytes_per_instance(channel_function, input_)))
+
+if __name__ == "__main__":
+    main()
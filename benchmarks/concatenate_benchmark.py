@@ -0,0 +1,42 @@
+"""Per call time of concatenated channels with and without fusing memoryless stages.
+
+The unfused channels send each input through both concatenated channels,
+like concatenate did before fusing.
+
+Run from the directory containing the package, e.g.:
+
+    python -m channel.benchmarks.concatenate_benchmark
+
+"""
+from functools import partial
+from timeit import repeat
+from .. import channels, numeric_channels, string_channels
+from ..channels import _Concatenation
+
+SAMPLES = 20000
+
+CHANNELS = (("numeric inverse", numeric_channels.sum_channel, partial(channels.memoryless_channel, numeric_channels._inverse),
+             partial(numeric_channels.inverse_channel, 1), (1, 2)),
+            ("numeric average", numeric_channels.sum_channel, partial(numeric_channels._single_input_moving_average_channel, 16),
+             partial(numeric_channels.moving_average_channel, 16), (1.5, 2)),
+            ("string reverse", string_channels.sum_channel, partial(channels.memoryless_channel, string_channels._reverse),
+             string_channels.reverse_channel, ("one", "two")),
+            ("string delay", string_channels.sum_channel, partial(channels.shift_channel, 1, [string_channels.DELAY_INITIAL]),
+             string_channels.delay_channel, ("one", "two")),
+            ("identity shift", channels.memoryless_channel, partial(channels.shift_channel, 4),
+             channels.concatenate(channels.memoryless_channel, channels.shift_channel, args_2=((4, ), {})), 1))
+
+def seconds_per_call(channel, input_):
+    send = channel.send
+    
+    return min(repeat(lambda: [send(input_) for _ in range(SAMPLES)], number=1, repeat=15)) / SAMPLES
+
+def main():
+    print("{0:>16} {1:>14} {2:>12} {3:>8}".format("channel", "unfused [ns]", "fused [ns]", "speedup"))
+    for name, channel_1, channel_2, fused_function, input_ in CHANNELS:
+        unfused = seconds_per_call(_Concatenation(channel_1(), channel_2()), input_)
+        fused = seconds_per_call(fused_function(), input_)
+        print("{0:>16} {1:>14.0f} {2:>12.0f} {3:>8.2f}".format(name, unfused * 1e9, fused * 1e9, unfused / fused))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Per tick cost of incremental networks for inputs that change on a fraction of the ticks.
+
+The network consists of branches of memoryless string channels, the inputs
+are repeated for a number of ticks before they change.
+
+Run from the directory containing the package, e.g.:
+
+    python -m channel.benchmarks.incremental_benchmark
+
+"""
+from timeit import repeat
+from .. import string_channels
+from ..network import NetworkDefinition, NetworkFactory
+
+BRANCHES = 50
+TICKS = 1000
+CHANGED_FRACTIONS = (1.0, 0.5, 0.1, 0.01)
+
+NETWORK_CHANNELS = {"sum": string_channels.sum_channel,
+                    "echo": string_channels.echo_channel,
+                    "reverse": string_channels.reverse_channel}
+
+def branches_definition(branches):
+    definition = NetworkDefinition(NETWORK_CHANNELS.keys())
+    definition.add_module("in", "sum")
+    for i in range(branches):
+        definition.add_module(("echo", i), "echo")
+        definition.add_module(("reverse", i), "reverse")
+        definition.add_connection("in", ("echo", i))
+        definition.add_connection(("echo", i), ("reverse", i))
+    definition.add_module("out", "sum")
+    for i in range(branches):
+        definition.add_connection(("reverse", i), "out")
+    
+    return definition
+
+def inputs(changed_fraction):
+    period = round(1 / changed_fraction)
+    values = [str(i) for i in range(TICKS // period + 1)]
+    
+    return [values[tick // period] for tick in range(TICKS)]
+
+def seconds_per_tick(network_function, inputs):
+    def process():
+        send = network_function().send
+        for input_ in inputs:
+            send(input_)
+    
+    return min(repeat(process, number=1, repeat=3)) / len(inputs)
+
+def main():
+    factory = NetworkFactory(NETWORK_CHANNELS)
+    definition = branches_definition(BRANCHES)
+    compiled = factory.create(definition)
+    incremental = factory.create(definition, incremental=True)
+    print("{0:>10} {1:>14} {2:>18} {3:>8}".format("changed", "compiled [us]", "incremental [us]", "speedup"))
+    for changed_fraction in CHANGED_FRACTIONS:
+        ticks = inputs(changed_fraction)
+        full = seconds_per_tick(compiled, ticks)
+        partial_ = seconds_per_tick(incremental, ticks)
+        print("{0:>10.2f} {1:>14.1f} {2:>18.1f} {3:>8.1f}".format(changed_fraction, full * 1e6, partial_ * 1e6, full / partial_))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Accuracy and throughput of the incremental and the stable moving average.
+
+Run from the directory containing the package, e.g.:
+
+    python -m channel.benchmarks.moving_average_benchmark
+
+"""
+from time import perf_counter
+from ..channels import send_many
+from ..numeric_channels import _single_input_moving_average_channel
+from ..array_channels import moving_average_channel as array_moving_average_channel
+import math
+import numpy as np
+
+N = 64
+SAMPLES = 1000000
+
+def scalar_error(stable, inputs):
+    channel = _single_input_moving_average_channel(N, stable=stable)
+    averages = send_many(channel, inputs)
+    expected = math.fsum(inputs[-N:]) / N
+    
+    return abs(averages[-1] - expected) / abs(expected)
+
+def throughput(create_channel, inputs, block):
+    channel = create_channel()
+    start = perf_counter()
+    if block:
+        send_many(channel, inputs)
+    else:
+        send = channel.send
+        for input_ in inputs:
+            send(input_)
+    
+    return len(inputs) / (perf_counter() - start)
+
+def main():
+    inputs = 1e9 + np.random.random(SAMPLES)
+    arrays = 1e9 + np.random.random((SAMPLES // 100, 16))
+    
+    print("{0:>8} {1:>16} {2:>16} {3:>16} {4:>16}".format("stable", "relative error", "scalar [1/s]", "block [1/s]", "array [1/s]"))
+    for stable in (False, True):
+        error = scalar_error(stable, inputs)
+        scalar = throughput(lambda: _single_input_moving_average_channel(N, stable=stable), inputs[:SAMPLES // 10], False)
+        block = throughput(lambda: _single_input_moving_average_channel(N, stable=stable), inputs, True)
+        array = throughput(lambda: array_moving_average_channel(N, stable=stable), arrays, False)
+        print("{0:>8} {1:>16.3e} {2:>16.0f} {3:>16.0f} {4:>16.0f}".format(str(stable), error, scalar, block, array))
+
+if __name__ == "__main__":
+    main()
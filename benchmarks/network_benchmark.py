@@ -0,0 +1,48 @@
+"""Per-tick cost of interpreted, compiled and block processing network channels.
+
+Run from the directory containing the package, e.g.:
+
+    python -m channel.benchmarks.network_benchmark
+
+"""
+from functools import partial
+from timeit import repeat
+from .._module import Module
+from .._network import network_channel, compile_network, compiled_network_channel
+from ..channels import send_many
+from ..numeric_channels import sum_channel, inverse_channel
+
+SIZES = (10, 100, 500)
+TICKS = 200
+
+def chain_network(size):
+    """Returns modules and connections of a chain with fan-in two of the given size."""
+    modules = [Module(0, sum_channel)] + [Module(i, partial(inverse_channel, 1)) for i in range(1, size)]
+    connections = {i: (i - 1, ) if i < 2 else (i - 1, i - 2) for i in range(1, size)}
+    
+    return modules, connections
+
+def time_per_tick(channel, ticks=TICKS):
+    send = channel.send
+    seconds = min(repeat(lambda: [send(0) for _ in range(ticks)], number=1, repeat=5))
+    
+    return seconds / ticks
+
+def time_per_tick_in_blocks(channel, ticks=TICKS):
+    block = [0] * ticks
+    seconds = min(repeat(lambda: send_many(channel, block), number=1, repeat=5))
+    
+    return seconds / ticks
+
+def main():
+    print("{0:>8} {1:>16} {2:>16} {3:>8} {4:>16} {5:>8}".format("modules", "interpreted [us]", "compiled [us]", "speedup", "block [us]", "speedup"))
+    for size in SIZES:
+        modules, connections = chain_network(size)
+        plan = compile_network(modules, connections)
+        interpreted = time_per_tick(network_channel(modules, connections))
+        compiled = time_per_tick(compiled_network_channel(plan))
+        block = time_per_tick_in_blocks(compiled_network_channel(plan))
+        print("{0:>8} {1:>16.1f} {2:>16.1f} {3:>8.2f} {4:>16.1f} {5:>8.2f}".format(size, interpreted * 1e6, compiled * 1e6, interpreted / compiled, block * 1e6, interpreted / block))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Block processing time of a wide network with serial and concurrent executors.
+
+Run from the directory containing the package, e.g.:
+
+    python -m channel.benchmarks.parallel_benchmark
+
+"""
+from functools import partial
+from time import perf_counter
+from .. import array_channels
+from ..channels import send_many
+from ..network import NetworkDefinition, NetworkFactory
+import numpy as np
+
+WIDTH = 64
+BRANCHES = 16
+BLOCK_LENGTH = 2000
+
+CHANNELS = {"sum": array_channels.sum_channel,
+            "average": partial(array_channels.moving_average_channel, 32)}
+
+def wide_definition(branches):
+    """Returns a definition with the given number of parallel branches between an input and an output module."""
+    definition = NetworkDefinition(CHANNELS.keys())
+    definition.add_module("in", "sum")
+    for branch in range(branches):
+        definition.add_module(branch, "average")
+        definition.add_connection("in", branch)
+    definition.add_module("out", "sum")
+    for branch in range(branches):
+        definition.add_connection(branch, "out")
+    
+    return definition
+
+def seconds_per_block(network, inputs):
+    start = perf_counter()
+    send_many(network, inputs)
+    
+    return perf_counter() - start
+
+def main():
+    factory = NetworkFactory(CHANNELS)
+    definition = wide_definition(BRANCHES)
+    inputs = np.random.random((BLOCK_LENGTH, WIDTH))
+    
+    print("{0:>10} {1:>10}".format("executor", "block [s]"))
+    for executor in (None, "thread", "process"):
+        network = factory.create(definition, executor)()
+        seconds = seconds_per_block(network, inputs)
+        if executor:
+            network.close()
+        print("{0:>10} {1:>10.3f}".format(str(executor), seconds))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Time to snapshot, pickle, unpickle and restore the state of large networks.
+
+Run from the directory containing the package, e.g.:
+
+    python -m channel.benchmarks.snapshot_benchmark
+
+"""
+from functools import partial
+from timeit import repeat
+import pickle
+from .. import channels, numeric_channels
+from ..network import NetworkDefinition, NetworkFactory
+
+SIZES = (100, 1000, 10000)
+
+NETWORK_CHANNELS = {"sum": numeric_channels.sum_channel,
+                    "average": partial(numeric_channels.moving_average_channel, 16)}
+
+def wide_definition(size):
+    definition = NetworkDefinition(NETWORK_CHANNELS.keys())
+    definition.add_module("in", "sum")
+    for i in range(size - 2):
+        definition.add_module(i, "average")
+        definition.add_connection("in", i)
+    definition.add_module("out", "sum")
+    for i in range(size - 2):
+        definition.add_connection(i, "out")
+    
+    return definition
+
+def best_milliseconds(function):
+    return min(repeat(function, number=1, repeat=3)) * 1e3
+
+def main():
+    factory = NetworkFactory(NETWORK_CHANNELS)
+    print("{0:>8} {1:>14} {2:>14} {3:>14} {4:>10}".format("modules", "snapshot [ms]", "save [ms]", "restore [ms]", "size [kB]"))
+    for size in SIZES:
+        network = factory.create(wide_definition(size))()
+        for input_ in range(20):
+            network.send(input_)
+        
+        state = channels.snapshot(network)
+        data = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        restored = factory.create(wide_definition(size))()
+        
+        snapshot_time = best_milliseconds(lambda: channels.snapshot(network))
+        save_time = best_milliseconds(lambda: pickle.dumps(channels.snapshot(network), protocol=pickle.HIGHEST_PROTOCOL))
+        restore_time = best_milliseconds(lambda: channels.restore(restored, pickle.loads(data)))
+        print("{0:>8} {1:>14.2f} {2:>14.2f} {3:>14.2f} {4:>10.0f}".format(size, snapshot_time, save_time, restore_time, len(data) / 1e3))
+
+if __name__ == "__main__":
+    main()
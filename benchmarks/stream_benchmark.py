@@ -0,0 +1,35 @@
+"""Per-tick cost of one channel per stream against one channel for all streams.
+
+Run from the directory containing the package, e.g.:
+
+    python -m channel.benchmarks.stream_benchmark
+
+"""
+from timeit import repeat
+from .. import channels, numeric_channels, stream_channels
+import numpy as np
+
+STREAMS = (10, 1000, 10000)
+N = 16
+TICKS = 20
+
+def seconds_per_tick(process, inputs):
+    return min(repeat(lambda: [process(input_) for input_ in inputs], number=1, repeat=3)) / len(inputs)
+
+def per_stream(channel_function, streams):
+    sends = [channel_function().send for _ in range(streams)]
+    
+    return lambda input_: [send(value) for send, value in zip(sends, input_)]
+
+def main():
+    print("{0:>12} {1:>8} {2:>16} {3:>16} {4:>8}".format("channel", "streams", "per stream [us]", "vectorized [us]", "speedup"))
+    for streams in STREAMS:
+        inputs = np.random.random((TICKS, streams))
+        for name, channel_function, vectorized in (("average", lambda: numeric_channels.moving_average_channel(N), stream_channels.moving_average_channel(streams, N)),
+                                                   ("shift", lambda: channels.shift_channel(N), stream_channels.shift_channel(streams, N))):
+            separate = seconds_per_tick(per_stream(channel_function, streams), inputs)
+            together = seconds_per_tick(vectorized.send, inputs)
+            print("{0:>12} {1:>8} {2:>16.1f} {3:>16.1f} {4:>8.0f}".format(name, streams, separate * 1e6, together * 1e6, separate / together))
+
+if __name__ == "__main__":
+    main()
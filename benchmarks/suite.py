@@ -0,0 +1,185 @@
+"""Benchmark suite for channels, networks and sequence drivers.
+
+Measures the per sample throughput of the built-in channels, the per tick
+cost of networks with chain, wide and nested topologies of several sizes,
+the throughput of the sequence drivers and the memory per channel instance.
+The results are written as JSON, so that the results of different commits
+can be compared.
+
+Run from the directory containing the package, e.g.:
+
+    python -m channel.benchmarks.suite --output results.json
+    python -m channel.benchmarks.suite --compare baseline.json
+
+"""
+from argparse import ArgumentParser
+from functools import partial
+from itertools import islice
+from timeit import repeat
+import json
+import platform
+import subprocess
+import sys
+import tracemalloc
+from .. import channels, numeric_channels, string_channels, array_channels, stream_channels
+from ..network import NetworkDefinition, NetworkFactory
+import numpy as np
+
+SAMPLES = 2000
+REPEAT = 3
+
+CHANNELS = (("channels.shift_channel", partial(channels.shift_channel, 4), 1),
+            ("channels.memoryless_channel", channels.memoryless_channel, 1),
+            ("numeric_channels.sum_channel", numeric_channels.sum_channel, (1, 2)),
+            ("numeric_channels.inverse_channel", partial(numeric_channels.inverse_channel, 1), (1, 2)),
+            ("numeric_channels.moving_average_channel", partial(numeric_channels.moving_average_channel, 16), 1.5),
+            ("string_channels.sum_channel", string_channels.sum_channel, ("one", "two")),
+            ("string_channels.delay_channel", string_channels.delay_channel, "one"),
+            ("string_channels.echo_channel", string_channels.echo_channel, "one"),
+            ("string_channels.reverse_channel", string_channels.reverse_channel, "one"),
+            ("array_channels.sum_channel", array_channels.sum_channel, np.ones((2, 64))),
+            ("array_channels.accumulating_sum_channel", array_channels.accumulating_sum_channel, np.ones((2, 64))),
+            ("array_channels.moving_average_channel", partial(array_channels.moving_average_channel, 16), np.ones(64)),
+            ("stream_channels.moving_average_channel", partial(stream_channels.moving_average_channel, 64, 16), np.ones(64)),
+            ("stream_channels.shift_channel", partial(stream_channels.shift_channel, 64, 16), np.ones(64)))
+
+NETWORK_CHANNELS = {"sum": numeric_channels.sum_channel,
+                    "inverse": partial(numeric_channels.inverse_channel, 1),
+                    "average": partial(numeric_channels.moving_average_channel, 4)}
+
+def best_seconds(function):
+    return min(repeat(function, number=1, repeat=REPEAT))
+
+def throughput(channel, input_, samples=SAMPLES):
+    """Returns the number of inputs per second processed by the channel."""
+    send = channel.send
+    
+    return samples / best_seconds(lambda: [send(input_) for _ in range(samples)])
+
+def chain_definition(size):
+    definition = NetworkDefinition(NETWORK_CHANNELS.keys())
+    definition.add_module(0, "sum")
+    for i in range(1, size):
+        definition.add_module(i, "average" if i % 2 else "inverse")
+        definition.add_connection(i - 1, i)
+    
+    return definition
+
+def wide_definition(size):
+    definition = NetworkDefinition(NETWORK_CHANNELS.keys())
+    definition.add_module("in", "sum")
+    for i in range(size):
+        definition.add_module(i, "average")
+        definition.add_connection("in", i)
+    definition.add_module("out", "sum")
+    for i in range(size):
+        definition.add_connection(i, "out")
+    
+    return definition
+
+def nested_factory(depth):
+    """Returns a factory with the channel type "nested" that nests chains of four modules depth times."""
+    factory = NetworkFactory(NETWORK_CHANNELS)
+    channel_type = "average"
+    for level in range(depth):
+        definition = NetworkDefinition(factory.available_channel_types())
+        for i in range(4):
+            definition.add_module(i, channel_type if i else "sum")
+            if i:
+                definition.add_connection(i - 1, i)
+        channel_type = "nested_{0}".format(level)
+        factory.define_channel_type(channel_type, definition)
+    
+    definition = NetworkDefinition(factory.available_channel_types())
+    definition.add_module("nested", channel_type)
+    
+    return factory, definition
+
+def network_cases():
+    factory = NetworkFactory(NETWORK_CHANNELS)
+    for size in (10, 100, 500):
+        yield "network.chain", {"size": size}, factory.create(chain_definition(size))
+    for size in (10, 100, 500):
+        yield "network.wide", {"size": size}, factory.create(wide_definition(size))
+    for depth in (1, 2, 3, 4):
+        nested, definition = nested_factory(depth)
+        yield "network.nested", {"depth": depth}, nested.create(definition)
+
+def memory_per_instance(channel_function, input_, instances=1000):
+    """Returns the number of bytes allocated per started channel after processing the input once."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    started = [channel_function() for _ in range(instances)]
+    for channel in started:
+        channel.send(input_)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del started
+    
+    return allocated / instances
+
+def run():
+    """Runs all benchmarks and returns a list of results."""
+    results = []
+    def add(name, params, value, unit):
+        results.append({"name": name, "params": params, "value": value, "unit": unit})
+    
+    for name, channel_function, input_ in CHANNELS:
+        add(name, {}, throughput(channel_function(), input_), "samples/s")
+        add(name + ".memory", {}, memory_per_instance(channel_function, input_), "bytes")
+        block = [input_] * SAMPLES
+        channel = channel_function()
+        add(name + ".send_many", {}, SAMPLES / best_seconds(lambda: channels.send_many(channel, block)), "samples/s")
+    
+    for name, params, network_function in network_cases():
+        network = network_function()
+        add(name, params, 1e6 / throughput(network, 1, samples=200), "us/tick")
+        block = [1] * 200
+        add(name + ".send_many", params, 1e6 * best_seconds(lambda: channels.send_many(network, block)) / 200, "us/tick")
+    
+    inputs = ["one", "two", "three"] * (SAMPLES // 3)
+    add("string_channels.process_sequence", {}, SAMPLES / best_seconds(lambda: list(islice(string_channels.process_sequence(string_channels.delay_channel(), inputs), SAMPLES))), "samples/s")
+    add("string_channels.process_stream", {}, SAMPLES / best_seconds(lambda: list(string_channels.process_stream(string_channels.delay_channel(), inputs))), "samples/s")
+    inputs = list(range(SAMPLES))
+    add("numeric_channels.process_sequence", {}, SAMPLES / best_seconds(lambda: list(islice(numeric_channels.process_sequence(numeric_channels.moving_average_channel(16), inputs), SAMPLES))), "samples/s")
+    add("numeric_channels.process_stream", {}, SAMPLES / best_seconds(lambda: list(numeric_channels.process_stream(numeric_channels.moving_average_channel(16), inputs))), "samples/s")
+    
+    return results
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    
+    return {"commit": commit, "python": sys.version.split()[0], "numpy": np.__version__, "machine": platform.machine()}
+
+def compare(results, baseline):
+    """Prints the ratio of each result to the result with the same name and parameters in the baseline."""
+    previous = {(result["name"], json.dumps(result["params"], sort_keys=True)): result["value"] for result in baseline["results"]}
+    for result in results:
+        key = (result["name"], json.dumps(result["params"], sort_keys=True))
+        ratio = "{0:.2f}".format(result["value"] / previous[key]) if previous.get(key) else "-"
+        print("{0:<50} {1:<14} {2:>14.1f} {3:<10} {4:>6}".format(result["name"], key[1], result["value"], result["unit"], ratio))
+
+def main(arguments=None):
+    parser = ArgumentParser(description="Runs the benchmark suite.")
+    parser.add_argument("--output", help="file to write the results as JSON to")
+    parser.add_argument("--compare", help="JSON file with results to compare to")
+    arguments = parser.parse_args(arguments)
+    
+    results = run()
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump({"environment": environment(), "results": results}, file, indent=2)
+    
+    if arguments.compare:
+        with open(arguments.compare) as file:
+            compare(results, json.load(file))
+    else:
+        compare(results, {"results": []})
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""Throughput of the array sum channels for different numbers of inputs.
+
+Run from the directory containing the package, e.g.:
+
+    python -m channel.benchmarks.sum_benchmark
+
+"""
+from timeit import repeat
+from ..array_channels import sum_channel, accumulating_sum_channel
+import numpy as np
+
+WIDTH = 1024
+FAN_IN = (1, 2, 8, 64)
+TICKS = 1000
+
+def ticks_per_second(channel, inputs):
+    send = channel.send
+    seconds = min(repeat(lambda: [send(inputs) for _ in range(TICKS)], number=1, repeat=3))
+    
+    return TICKS / seconds
+
+def main():
+    print("{0:>8} {1:>16} {2:>16}".format("inputs", "sum [1/s]", "accumulating [1/s]"))
+    for fan_in in FAN_IN:
+        inputs = list(np.random.random((fan_in, WIDTH)))
+        print("{0:>8} {1:>16.0f} {2:>16.0f}".format(fan_in, ticks_per_second(sum_channel(), inputs), ticks_per_second(accumulating_sum_channel(), inputs)))
+
+if __name__ == "__main__":
+    main()
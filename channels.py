@@ -10,19 +10,148 @@ using its send method:
 The generator is imediatelly initialized, that is, the first call to the
 send method should already contain the first input value, not None.
 
+Channels can in addition provide a send_many method that processes a block of
+inputs at once. The send_many function processes a block on any channel:
+
+>>> outputs = send_many(initialized_channel, inputs)
+
+The built-in channels are instances of Channel subclasses, which keep their
+state in __slots__ instead of a suspended generator. They process an input by
+a single method call and also support the remaining generator methods, so
+they can be used wherever a generator channel is expected.
+
+Channels can provide snapshot and restore methods to export their state as
+plain data, that is NumPy arrays, lists, numbers and dicts thereof, and to
+continue from an exported state, e.g. after a restart:
+
+>>> state = snapshot(initialized_channel)
+>>> restore(other_initialized_channel, state)
+
+Channel -- base class for class based channels
 shift_channel -- process consecutive inputs and output them shifted against the input
 memoryless_channel -- process consecutive inputs independently 
+cached_memoryless_channel -- process consecutive inputs independently and cache the outputs
+cached_channel -- cache the outputs of a memoryless channel
+cached -- channel function for cached channels of a memoryless channel function
 multi_input_channel -- decorator to concatenate a single input channel with a channel that allows multiple inputs
 concatenate -- concatenate channels
+send_many -- process a block of inputs on a channel
+snapshot -- export the state of a channel
+restore -- restore the state of a channel
+gate_channel -- outputs its second input if its first input is true
+select_channel -- outputs the input selected by its first input
+deterministic -- decorator to declare that a channel function creates deterministic channels
+is_deterministic -- whether a channel function creates deterministic channels
+memoryless -- decorator to declare that a channel function creates memoryless channels
+is_memoryless -- whether a channel function creates memoryless channels
+lazy_inputs -- decorator to declare that the channels of a channel function may not read all inputs
+is_lazy_inputs -- whether the channels of a channel function may not read all inputs
+process_stream -- process an iterable of inputs on a channel in chunks
 
 """
-from ._util import compose, identity, start
-from itertools import chain
+from ._util import identity, compose
+from collections import namedtuple
+from collections.abc import Iterator
+from functools import partial, wraps
+from itertools import chain, islice, repeat
+import inspect
+
+
+class Channel():
+    """Base class for channels that keep their state in attributes.
+    
+    Subclasses implement send and may implement send_many, snapshot and
+    restore. The generator methods are provided for compatibility with
+    generator channels: next sends None, close does nothing and throw raises
+    the given exception. Subclasses that are created in large numbers, like
+    the built-in channels, should declare __slots__ to save memory.
+    
+    """
+    __slots__ = ()
+    
+    def send(self, value):
+        raise NotImplementedError()
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self):
+        return self.send(None)
+    
+    def close(self):
+        pass
+    
+    def throw(self, exception, value=None, traceback=None):
+        if value is None:
+            value = exception() if isinstance(exception, type) else exception
+        
+        raise value.with_traceback(traceback)
+
+def deterministic(channel_function):
+    """Decorator to declare that the decorated channel function creates deterministic channels.
+    
+    Channels created by a deterministic channel function with the same
+    arguments return the same outputs for the same sequence of inputs, that
+    is, they neither depend on nor cause side effects. Networks may share the
+    outputs of such channels (See also modular.network.NetworkFactory.create).
+    
+    """
+    return _declare(channel_function, "deterministic")
+
+def is_deterministic(channel_function):
+    """Returns whether the given channel function is declared deterministic.
+    
+    A functools.partial of a deterministic channel function is deterministic
+    as well.
+    
+    """
+    return _is_declared(channel_function, "deterministic")
 
+def memoryless(channel_function):
+    """Decorator to declare that the decorated channel function creates memoryless channels.
+    
+    The output of a memoryless channel only depends on the current input,
+    so networks may skip sending inputs whose output is not needed (See also
+    modular.network.NetworkFactory.create).
+    
+    """
+    return _declare(channel_function, "memoryless")
+
+def is_memoryless(channel_function):
+    """Returns whether the given channel function, or the function of a functools.partial, is declared memoryless."""
+    return _is_declared(channel_function, "memoryless")
+
+def lazy_inputs(channel_function):
+    """Decorator to declare that channels of the decorated channel function may not read all of their inputs.
+    
+    In lazy networks these channels receive a sequence of their inputs that
+    computes each input when it is first read (See also
+    modular.network.NetworkFactory.create).
+    
+    """
+    return _declare(channel_function, "lazy_inputs")
+
+def is_lazy_inputs(channel_function):
+    """Returns whether the given channel function, or the function of a functools.partial, is declared with lazy inputs."""
+    return _is_declared(channel_function, "lazy_inputs")
+
+def _declare(channel_function, declaration):
+    setattr(channel_function, declaration, True)
+    
+    return channel_function
+
+def _is_declared(channel_function, declaration):
+    while not getattr(channel_function, declaration, False):
+        if not isinstance(channel_function, partial):
+            return False
+        channel_function = channel_function.func
+    
+    return True
 
-@start
 def shift_channel(n, initial_values = [], operation = identity, zero_val=None):
-    """Returns a generator that returns its processed output shifted by n iterations against its input.
+    """Returns a channel that returns its processed output shifted by n iterations against its input.
+    
+    The channel processes blocks of inputs natively (See send_many).
     
     Keyword arguments:
     
@@ -33,49 +162,366 @@ def shift_channel(n, initial_values = [], operation = identity, zero_val=None):
     if len(initial_values) > n:
         raise ValueError("There can be at most {0} initial values: {1} where given ".format(n, len(initial_values)))
     
-    length = n + 1
-    buffer_ = [zero_val] * (n - len(initial_values)) + list(initial_values) + [zero_val] 
+    if operation is identity:
+        return _ShiftChannel(n, initial_values, operation, zero_val)
     
-    count = n
-    while True:
-        buffer_[count] = operation((yield buffer_[count]))
-        count = (count + 1) % length
+    return _OperationShiftChannel(n, initial_values, operation, zero_val)
+
 
+class _ShiftChannel(Channel):
+    #The n pending outputs, starting with the oldest one. Popping the first
+    #of a few items is cheaper than updating a count in an attribute
+    __slots__ = ("_operation", "_pending")
+    
+    def __init__(self, n, initial_values, operation, zero_val):
+        self._operation = operation
+        self._pending = [zero_val] * (n - len(initial_values)) + list(initial_values)
+
+    def send(self, value):
+        pending = self._pending
+        pending.append(value)
+        
+        return pending.pop(0)
 
-@start
+    def send_many(self, inputs):
+        values = inputs if self._operation is identity else [self._operation(input_) for input_ in inputs]
+        values = list(values)
+        if not values:
+            return []
+        
+        history = self._pending + values
+        self._pending = history[len(values):]
+        
+        return history[:len(values)]
+    
+    def snapshot(self):
+        return {"pending": list(self._pending)}
+    
+    def restore(self, state):
+        if len(state["pending"]) != len(self._pending):
+            raise ValueError("The state is not a state of a shift channel of length {0}".format(len(self._pending)))
+        
+        self._pending = list(state["pending"])
+    
+    def _fuse_input(self, operation):
+        self._operation = compose(self._operation, operation)
+        if self._operation is not identity:
+            self.__class__ = _OperationShiftChannel
+
+
+class _OperationShiftChannel(_ShiftChannel):
+    #Applies the operation to the inputs, the identity is skipped by the base
+    __slots__ = ()
+    
+    def send(self, value):
+        pending = self._pending
+        pending.append(self._operation(value))
+        
+        return pending.pop(0)
+
+
+@memoryless
 def memoryless_channel(operation = identity):
-    """Returns a generator that processes its inputs independently and returns the output immediately.
+    """Returns a channel that processes its inputs independently and returns the output immediately.
     
     Keyword arguments:
     
     operation -- a function that operates on the inputs to the generator (default identity)
     
     """ 
-    processed_value = None
-    while True:
-        value = (yield processed_value)
-        processed_value = operation(value)
+    return _MemorylessChannel(operation)
+
 
-def multi_input_channel(sum_channel):
-    """Decorator to concatenate the given sum_channel with the decorated channel."""
+class _MemorylessChannel(Channel):
+    #The operation is called directly as the send method of the instance
+    __slots__ = ("send", )
+    
+    def __init__(self, operation):
+        self.send = operation
+        
+    def snapshot(self):
+        return {}
+    
+    def restore(self, state):
+        pass
+
+CacheInfo = namedtuple("CacheInfo", ("hits", "misses", "max_size", "size"))
+
+@memoryless
+def cached_memoryless_channel(operation = identity, max_size=128):
+    """Returns a memoryless channel that caches the outputs for the last max_size distinct inputs.
+    
+    The channel behaves like memoryless_channel, except that operation is
+    only called for inputs that are not in the cache. The cache is a least
+    recently used cache keyed on the inputs. Lists and iterators of inputs are
+    keyed as tuples, iterators are also passed as tuples to operation. Inputs
+    that are not hashable are not cached.
+    
+    The method cache_info of the channel returns a CacheInfo with the
+    number of hits and misses, max_size and the current size of the cache.
+    
+    """ 
+    return cached_channel(memoryless_channel(operation), max_size)
+
+def cached_channel(channel, max_size=128):
+    """Returns a channel that caches the outputs of the given initialized memoryless channel.
+    
+    See cached_memoryless_channel. If max_size is less than 1, a ValueError
+    is raised.
+    
+    """
+    if max_size < 1:
+        raise ValueError("The cache size must be at least 1: {0} was given".format(max_size))
+    
+    return _CachedChannel(channel, max_size)
+
+def cached(channel_function, max_size=128):
+    """Returns a channel function that creates cached channels of the given memoryless channel function.
+    
+    The returned channel function passes its arguments to channel_function
+    and is declared memoryless, and deterministic if channel_function is.
+    
+    """
+    cached_function = partial(_start_cached, channel_function, max_size)
+    if is_deterministic(channel_function):
+        deterministic(cached_function)
+    
+    return cached_function
+
+@memoryless
+def _start_cached(channel_function, max_size, *args, **kwargs):
+    return cached_channel(channel_function(*args, **kwargs), max_size)
+
+class _CachedChannel(Channel):
+    __slots__ = ("_channel", "_send", "_cache", "_max_size", "_hits", "_misses")
+    
+    def __init__(self, channel, max_size):
+        self._channel = channel
+        self._send = channel.send
+        self._cache = {}
+        self._max_size = max_size
+        self._hits = 0
+        self._misses = 0
+        
+    def send(self, value):
+        if isinstance(value, list):
+            key = tuple(value)
+        elif isinstance(value, Iterator):
+            value = key = tuple(value)
+        else:
+            key = value
+        
+        #Dicts keep the insertion order, the least recently used output is
+        #the first one
+        cache = self._cache
+        try:
+            output = cache.pop(key)
+        except KeyError:
+            self._misses += 1
+            output = self._send(value)
+            try:
+                cache[key] = output
+            except TypeError:
+                return output
+            if len(cache) > self._max_size:
+                del cache[next(iter(cache))]
+            
+            return output
+        except TypeError:
+            self._misses += 1
+            
+            return self._send(value)
+        
+        self._hits += 1
+        cache[key] = output
+        
+        return output
+    
+    def cache_info(self):
+        return CacheInfo(self._hits, self._misses, self._max_size, len(self._cache))
+    
+    def cache_clear(self):
+        self._cache.clear()
+        self._hits = self._misses = 0
+    
+    def snapshot(self):
+        return snapshot(self._channel)
+    
+    def restore(self, state):
+        restore(self._channel, state)
+
+def _gate(inputs, zero_val):
+    return inputs[1] if inputs[0] else zero_val
+
+@deterministic
+@memoryless
+@lazy_inputs
+def gate_channel(zero_val=None):
+    """Returns a channel that outputs its second input if its first input is true and zero_val otherwise.
+    
+    The second input is only read if the first input is true, so in a lazy
+    network the modules providing it are only processed when needed.
+    
+    """
+    return memoryless_channel(partial(_gate, zero_val=zero_val))
+
+def _select(inputs):
+    return inputs[inputs[0] + 1]
+
+@deterministic
+@memoryless
+@lazy_inputs
+def select_channel():
+    """Returns a channel that outputs the input following its first input at the index given by the first input.
+    
+    For the inputs (i, value_0, value_1, ...) the channel outputs value_i.
+    Only the first and the selected input are read, so in a lazy network the
+    modules providing the other inputs are only processed when needed.
+    
+    """
+    return memoryless_channel(_select)
+
+def multi_input_channel(sum_channel, sum_args=()):
+    """Decorator to concatenate the given sum_channel with the decorated channel.
+    
+    The decorated channel function takes the name of the channel, so that it
+    is pickled by reference, e.g. for worker processes started by spawn.
+    
+    Keyword arguments:
+    
+    sum_args -- names of arguments of the decorated channel that are passed
+                to sum_channel as keyword arguments as well, with the
+                defaults of the decorated channel (default empty)
+    
+    """
     def wrapper(channel):
+        signature = inspect.signature(channel) if sum_args else None
+        
+        @wraps(channel, updated=())
         def generator_function(*args, **kwargs):
-            return concatenate(sum_channel, channel, args_2=(args, kwargs))()
+            sum_kwargs = {}
+            if sum_args:
+                arguments = signature.bind(*args, **kwargs)
+                arguments.apply_defaults()
+                sum_kwargs = {name: arguments.arguments[name] for name in sum_args}
+            
+            return concatenate(sum_channel, channel, ((), sum_kwargs), (args, kwargs))()
         
         return generator_function
 
     return wrapper
 
 def concatenate(channel_1, channel_2, args_1=((),{}), args_2=((),{})):
-    """Concatenates the given channels, that is the output of channel_1 is sent to channel_2"""
-    def generator_function():
-        send_1 = channel_1(*args_1[0], **args_1[1]).send
-        send_2 = channel_2(*args_2[0], **args_2[1]).send
+    """Concatenates the given channels, that is the output of channel_1 is sent to channel_2
     
-        return memoryless_channel(compose(send_2, send_1))
+    A memoryless first channel is fused into the second channel if possible,
+    so that the concatenation is a single channel: two memoryless channels
+    are fused into one memoryless channel of the composed operations, a shift
+    or moving average channel applies the operation to its inputs. Channels
+    with the identity operation are dropped.
+    
+    """
+    def generator_function():
+        return _fuse(channel_1(*args_1[0], **args_1[1]), channel_2(*args_2[0], **args_2[1]))
     
     return generator_function
 
+def _fuse(channel_1, channel_2):
+    if type(channel_2) is _MemorylessChannel and channel_2.send is identity:
+        return channel_1
+    
+    if type(channel_1) is not _MemorylessChannel:
+        return _Concatenation(channel_1, channel_2)
+    
+    operation = channel_1.send
+    if type(channel_2) is _MemorylessChannel:
+        return _MemorylessChannel(compose(channel_2.send, operation))
+    
+    if operation is identity:
+        return channel_2
+    
+    #Channels that apply an operation to their inputs absorb the first channel
+    fuse_input = getattr(channel_2, "_fuse_input", None)
+    if fuse_input is None:
+        return _Concatenation(channel_1, channel_2)
+    
+    fuse_input(operation)
+    
+    return channel_2
+
+class _Concatenation(Channel):
+    __slots__ = ("_channel_1", "_channel_2", "_send_1", "_send_2")
+    
+    def __init__(self, channel_1, channel_2):
+        self._channel_1 = channel_1
+        self._channel_2 = channel_2
+        self._send_1 = channel_1.send
+        self._send_2 = channel_2.send
+        
+    def send(self, value):
+        return self._send_2(self._send_1(value))
+    
+    def send_many(self, inputs):
+        return send_many(self._channel_2, send_many(self._channel_1, inputs))
+    
+    def snapshot(self):
+        return {"channels": [snapshot(self._channel_1), snapshot(self._channel_2)]}
+    
+    def restore(self, state):
+        state_1, state_2 = state["channels"]
+        restore(self._channel_1, state_1)
+        restore(self._channel_2, state_2)
+
+def send_many(channel, inputs):
+    """Sends a block of inputs to the channel and returns the block of outputs.
+    
+    The result is the same as sending the inputs one by one, the state of the
+    channel is carried over to the next call. Channels that provide a
+    send_many method process the block natively and may return an ndarray,
+    for all other channels the inputs are sent one by one and a list is
+    returned.
+    
+    """
+    try:
+        send = channel.send_many
+    except AttributeError:
+        send = channel.send
+        
+        return [send(input_) for input_ in inputs]
+    
+    return send(inputs)
+
+def snapshot(channel):
+    """Returns the state of the given channel as plain data.
+    
+    The state contains copies, so the channel can process further inputs
+    without changing it, and can be pickled. If the channel does not provide
+    a snapshot method, e.g. a generator, a TypeError is raised.
+    
+    """
+    try:
+        channel_snapshot = channel.snapshot
+    except AttributeError:
+        raise TypeError("{0} does not support snapshots".format(type(channel).__name__)) from None
+    
+    return channel_snapshot()
+
+def restore(channel, state):
+    """Restores the given state, as returned by snapshot, on the given channel.
+    
+    The channel must be created by the same channel function with the same
+    arguments as the channel the state was taken from. If the channel does
+    not provide a restore method, a TypeError is raised, if the state does not
+    fit the channel, a ValueError.
+    
+    """
+    try:
+        channel_restore = channel.restore
+    except AttributeError:
+        raise TypeError("{0} does not support snapshots".format(type(channel).__name__)) from None
+    
+    channel_restore(state)
+
 def process_sequence(channel, input_sequence, infinite_tail, zero_val):
     """Returns an infinite generator of output strings for the given sequence of inputs.
     
@@ -90,4 +536,41 @@ def process_sequence(channel, input_sequence, infinite_tail, zero_val):
     inputs = chain(input_sequence, infinite_tail)
     raw_outputs = (channel.send(input_) for input_ in inputs)
     
-    return (output if output else zero_val for output in raw_outputs)
\ No newline at end of file
+    return (output if output is not None else zero_val for output in raw_outputs)
+
+def process_stream(channel, inputs, chunk_size=1024, flush=0, flush_val=None, zero_val=None):
+    """Returns a generator of chunks of outputs for the given iterable of inputs.
+    
+    The inputs are read from the iterable in chunks of at most chunk_size
+    inputs, each chunk is processed by send_many and the chunk of outputs is
+    yielded as list or ndarray. After the inputs, flush inputs of flush_val
+    are processed to drain delay lines, e.g. flush=n for shift_channel(n).
+    The generator terminates when all inputs are processed. Only one chunk
+    is held in memory at a time, so inputs may be unbounded, e.g. a file or a
+    queue.
+    
+    If zero_val is not None, None values in output lists are converted to
+    zero_val. If chunk_size is less than 1, a ValueError is raised.
+    
+    """
+    if chunk_size < 1:
+        raise ValueError("The chunk size must be at least 1: {0} was given".format(chunk_size))
+    
+    return _process_chunks(channel, inputs, chunk_size, flush, flush_val, zero_val)
+
+def _process_chunks(channel, inputs, chunk_size, flush, flush_val, zero_val):
+    for chunk in _chunks(chain(inputs, repeat(flush_val, flush)), chunk_size):
+        outputs = send_many(channel, chunk)
+        if zero_val is not None and isinstance(outputs, list):
+            outputs = [output if output is not None else zero_val for output in outputs]
+        
+        yield outputs
+
+def _chunks(iterable, chunk_size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        
+        yield chunk
@@ -16,13 +16,22 @@ Classes:
 
 NetworkDefinition -- Definition of the structure of the network based on identifiers
 NetworkFactory -- Creation of network channels based on standard and custom defined channels from a network definition
+NetworkPool -- Processing of independent input streams on copies of a network channel in worker processes
+NetworkStats -- Per module statistics of network channels created with profiling
 
 See also modular.channels.channels
 
 """
 from functools import partial
-from ._network import network_channel
+from itertools import chain
+from ._network import compile_network, compiled_network_channel, prune_network, merge_network
+from ._parallel import threaded_network_channel, process_network_channel, async_network_channel, WorkerPool
+from os import cpu_count
 from ._module import Module
+from .channels import is_deterministic, is_memoryless, cached
+from ._profile import NetworkStats, profiled_network_channel
+from ._lazy import lazy_network_channel
+from ._incremental import incremental_network_channel
 
 class NetworkDefinition():
     """Specifies an ordered list of named modules and directed connections between them.
@@ -46,13 +55,20 @@ class NetworkDefinition():
         """Returns a list with the ids of the modules defined in the current instance."""
         return [module.id for module in self.__modules]
 
-    def add_module(self, module_id, channel_type):
+    def add_module(self, module_id, channel_type, cache_size=None):
         """Adds the given channel_type with the given module_id to the definition.
         
         If the current instance already contains a module with the given
         module_id, a NameConflictError is raised. If the current instance does
         not accept the specified channel_type, an UndefinedNameError is raised.
         
+        Keyword arguments:
+        
+        cache_size -- cache the outputs of the module for the last cache_size
+                      distinct inputs, only for memoryless channel types
+                      (default None, See also
+                      modular.channels.cached_memoryless_channel)
+        
         """
         if channel_type not in self.__channel_types:
             raise UndefinedNameError("\"{0}\" is not defined".format(channel_type))
@@ -60,7 +76,10 @@ class NetworkDefinition():
         if module_id in self.available_module_ids():
             raise NameConflictError("\"{0}\" is already defined".format(module_id))
         
-        self.__modules += (Module(module_id, channel_type), )
+        if cache_size is not None and cache_size < 1:
+            raise ValueError("The cache size must be at least 1: {0} was given".format(cache_size))
+        
+        self.__modules += (Module(module_id, channel_type, cache_size), )
         
     def add_connection(self, from_module, to_module):
         """Adds a connection from from_module to to_module to the current instance.
@@ -110,6 +129,14 @@ class NetworkFactory():
     The output is the output of the last module in the network, even if there
     is no connected from the input module.
     
+    The network definition is compiled once when the network channel is
+    created, the created channels only execute the compiled plan. Modules of
+    channel types defined by a network definition are replaced by the
+    modules of that definition, with the id (module id, inner module id). The
+    created channels also process blocks of inputs via send_many (See also
+    modular.channels.channels), where each module processes the whole block
+    before the next module.
+    
     """
     def __init__(self, channels):
         """Initializes a new instance with the given channels.
@@ -119,31 +146,152 @@ class NetworkFactory():
         
         """
         self.__channels = channels.copy()
+        self.__definitions = {}
         
     def available_channel_types(self):
         """Returns a list of the available module type identifiers."""
         return self.__channels.keys()
         
-    def create(self, network_definition):
+    def create(self, network_definition, executor=None, workers=None, profile=None, prune=False, keep=(),
+               outputs=None, merge=False, lazy=False, incremental=False, equal=None):
         """Returns a network channel based on the given NetworkDefinition.
         
-        The returned network channel is a generator function that returns an
-        initialized generator that processes input via its send method (See
-        also modular.channels.channels).
+        The returned network channel is a channel function that returns an
+        initialized channel that processes input via its send method and, like
+        a generator, supports next, close and throw (See also
+        modular.channels.channels and modular.channels.Channel).
         
         If the specified network_definition contains module types that are not
-        accepted by the current instance, a KeyError is raised.
+        accepted by the current instance, a KeyError is raised. If the
+        executor is not known or the outputs of a module that is not
+        memoryless are cached, a ValueError is raised. If a module id to keep
+        or output is not defined, an UndefinedNameError is raised. If the id
+        (module id, inner id) of a module of a nested network is the id of
+        another module, a NameConflictError is raised.
+        
+        The method cache_info of channels created without executor returns a
+        dict with the CacheInfo of each module with cached outputs (See also
+        NetworkDefinition.add_module).
+        
+        Keyword arguments:
+        
+        executor -- None to process the modules one after the other, "thread"
+                    or "process" to process the modules of a topological level
+                    concurrently in a thread or process pool, "async" to await
+                    the async modules of a topological level concurrently
+                    (default None)
+        workers -- the number of threads or processes (default number of CPUs)
+        profile -- a NetworkStats instance that records the calls of the
+                   modules of all created channels, only supported without
+                   executor (default None)
+        prune -- skip the modules that do not influence the output, except
+                 for the first module, which receives the input (default False)
+        keep -- ids of modules that are processed even if they are pruned,
+                e.g. modules with side effects (default empty)
+        outputs -- ids of modules whose outputs the channel returns as a tuple
+                   per input, and as a tuple of output blocks per block,
+                   instead of the output of the last module (default None)
+        merge -- evaluate modules of the same deterministic channel type with
+                 the same input modules only once and share the output, except
+                 for the first and, without outputs, the last module
+                 (default False, See also modular.channels.deterministic)
+        lazy -- process each module when its output is first needed in a
+                tick and skip memoryless modules whose output is not needed,
+                e.g. the branches not selected by a gate_channel, not
+                supported with executor or profile (default False, See also
+                modular.channels.memoryless and modular.channels.lazy_inputs)
+        incremental -- process memoryless modules only if the output of one of
+                       their input modules changed and reuse their previous
+                       output otherwise, not supported with executor, profile
+                       or lazy (default False)
+        equal -- a function that returns whether two outputs, or two inputs
+                 of the network, are equal, used to detect unchanged outputs
+                 by incremental channels, without it an unchanged network
+                 input must be the previous input object and every processed
+                 module counts as changed (default None)
+        
+        Channels created without executor, including lazy and incremental
+        channels, or with the "thread" executor export and restore their
+        state by snapshot and restore (See also modular.channels.snapshot).
+        Channels created with the "thread" or "process" executor must be
+        closed by their close method to release the pool. Channels created
+        with the "async" executor are async channels (See also
+        modular.async_channels).
         
         """
+        if executor is not None and executor not in _EXECUTORS:
+            raise ValueError("\"{0}\" is not a known executor".format(executor))
+        
+        if executor is not None and profile is not None:
+            raise ValueError("Profiling is not supported with the \"{0}\" executor".format(executor))
+        
+        if lazy and (executor is not None or profile is not None):
+            raise ValueError("Lazy processing is not supported with an executor or profiling")
+        
+        if incremental and (executor is not None or profile is not None or lazy):
+            raise ValueError("Incremental processing is not supported with an executor, profiling or lazy processing")
+        
         modules, connections = network_definition._get_state()
+        module_ids = network_definition.available_module_ids()
+        undefined = [module_id for module_id in chain(keep, outputs or ()) if module_id not in module_ids]
+        if undefined:
+            raise UndefinedNameError("\"{0}\" is not defined".format(undefined[0]))
+        
+        plan = self.__compile(modules, connections, prune, keep, outputs, merge)
 
-        return self.__create(modules, connections, self.__channels)
+        if profile is not None:
+            return partial(profiled_network_channel, plan, profile)
+        
+        if lazy:
+            return partial(lazy_network_channel, plan)
+        
+        if incremental:
+            return partial(incremental_network_channel, plan, equal)
+        
+        if executor is None:
+            return partial(compiled_network_channel, plan)
+        
+        return partial(_EXECUTORS[executor], plan, workers)
     
-    def __create(self, modules, connections, channels):
-        channels = self.__channels
-        modules_instances = [Module(module.id, channels[module.channel]) for module in modules]
+    def __create(self, modules, connections):
+        return partial(compiled_network_channel, self.__compile(modules, connections))
+    
+    def __compile(self, modules, connections, prune=False, keep=(), outputs=None, merge=False):
+        modules, connections, flat_ids = self.__flatten(modules, connections)
+        #The output of a nested network is the output of its last module
+        output_ids = None if outputs is None else [flat_ids[module_id][-1] for module_id in outputs]
+        keep_ids = [flat_id for module_id in keep for flat_id in flat_ids[module_id]]
+        if merge and modules:
+            modules, connections, replaced = self.__merge(modules, connections, output_ids is None)
+            output_ids = None if output_ids is None else [replaced.get(module_id, module_id) for module_id in output_ids]
+            keep_ids = [replaced.get(module_id, module_id) for module_id in keep_ids]
+        
+        if prune and modules:
+            roots = {modules[-1].id} if output_ids is None else set(output_ids)
+            modules, connections = prune_network(modules, connections, roots.union(keep_ids))
+        
+        modules_instances = [Module(module.id, self.__channel(module)) for module in modules]
         
-        return partial(network_channel, modules_instances, connections)
+        return compile_network(modules_instances, connections, output_ids)
+    
+    def __channel(self, module):
+        channel = self.__channels[module.channel]
+        if module.cache_size is None:
+            return channel
+        
+        if not is_memoryless(channel):
+            raise ValueError("The outputs of \"{0}\" can not be cached, \"{1}\" is not memoryless".format(module.id, module.channel))
+        
+        return cached(channel, module.cache_size)
+
+    def __merge(self, modules, connections, keep_last):
+        #Without selected outputs the last module provides the output and
+        #must stay the last module
+        last_id = modules[-1].id if keep_last else None
+        def mergeable(module):
+            return module.id != last_id and is_deterministic(self.__channels[module.channel])
+        
+        return merge_network(modules, connections, mergeable)
 
     def define_channel_type(self, channel_type, network_definition):
         """Adds support for a new channel type based on the given definition to the current instance.
@@ -162,13 +310,129 @@ class NetworkFactory():
             raise NameConflictError("\"{0}\" is already defined".format(channel_type))
             
         self.__channels[channel_type] = self.__create_network_channel(network_definition)
+        self.__definitions[channel_type] = network_definition._get_state()
         
     def __create_network_channel(self, network_definition):
         modules, connections = network_definition._get_state()
         if not all(module.channel in self.__channels.keys() for module in modules):
             raise KeyError("Definition contains unsupported module types")
         
-        return self.__create(modules, connections, self.__channels)
+        return self.__create(modules, connections)
+    
+    def __flatten(self, modules, connections):
+        #Replaces modules of channel types defined by a network definition by
+        #the modules of the definition with the id (module id, inner id). The
+        #first inner module receives the inputs of the replaced module, the
+        #last inner module provides its output. Also returns the ids of the
+        #flat modules for each module id.
+        flat_modules = []
+        flat_connections = {}
+        flat_ids = {}
+        outputs = {}
+        for module in modules:
+            inputs = tuple(outputs[input_id] for input_id in connections.get(module.id, ()))
+            inner_modules, inner_connections = self.__definitions.get(module.channel, ((), {}))
+            if not inner_modules:
+                flat_modules.append(module)
+                if inputs:
+                    flat_connections[module.id] = inputs
+                flat_ids[module.id] = (module.id, )
+                outputs[module.id] = module.id
+                continue
+            
+            #Network channel types are not memoryless, so their outputs can
+            #not be cached
+            if module.cache_size is not None:
+                raise ValueError("The outputs of \"{0}\" can not be cached, \"{1}\" is not memoryless".format(module.id, module.channel))
+            
+            inner_modules, inner_connections, _ = self.__flatten(inner_modules, inner_connections)
+            for i, inner_module in enumerate(inner_modules):
+                flat_id = (module.id, inner_module.id)
+                flat_modules.append(Module(flat_id, inner_module.channel, inner_module.cache_size))
+                if not i:
+                    flat_inputs = inputs
+                else:
+                    flat_inputs = tuple((module.id, input_id) for input_id in inner_connections.get(inner_module.id, ()))
+                if flat_inputs:
+                    flat_connections[flat_id] = flat_inputs
+            flat_ids[module.id] = tuple((module.id, inner_module.id) for inner_module in inner_modules)
+            outputs[module.id] = (module.id, inner_modules[-1].id)
+        
+        #The ids of the inner modules may clash with the id of another module
+        defined = set()
+        for module in flat_modules:
+            if module.id in defined:
+                raise NameConflictError("\"{0}\" is already defined".format(module.id))
+            defined.add(module.id)
+        
+        return flat_modules, flat_connections, flat_ids
+
+class NetworkPool():
+    """Processes independent input streams on copies of a network channel in worker processes.
+    
+    For each stream id a copy of the network channel is started. The copies
+    are distributed evenly over the worker processes and stay in their
+    worker, only the inputs and outputs are transferred on each call.
+    
+    The network channel function must be picklable, e.g. a network channel
+    created by a NetworkFactory from picklable channel functions. The worker
+    processes are terminated by the close method.
+    
+    """
+    def __init__(self, network_channel, stream_ids, workers=None):
+        """Initializes a new instance with a copy of network_channel for each of the stream_ids."""
+        self.__stream_ids = tuple(stream_ids)
+        workers = max(1, min(workers or cpu_count(), len(self.__stream_ids)))
+        
+        self.__owners = {stream_id: i % workers for i, stream_id in enumerate(self.__stream_ids)}
+        channels = [{} for _ in range(workers)]
+        for stream_id, owner in self.__owners.items():
+            channels[owner][stream_id] = network_channel
+        
+        self.__pool = WorkerPool(channels)
+        
+    def stream_ids(self):
+        """Returns a tuple of the stream ids of the current instance."""
+        return self.__stream_ids
+        
+    def send(self, inputs):
+        """Sends the inputs to the networks of their streams and returns the outputs.
+        
+        The inputs must be a mapping from stream ids to inputs, the outputs
+        are returned as a dictionary from the same stream ids to the outputs.
+        Streams without input are not processed. If an input is given for an
+        unknown stream id, a KeyError is raised.
+        
+        """
+        return self.__process(inputs, False)
+    
+    def send_many(self, inputs):
+        """Sends blocks of inputs to the networks of their streams and returns the blocks of outputs.
+        
+        Like send, but with a block of inputs for each stream id (See also
+        send_many in modular.channels.channels).
+        
+        """
+        return self.__process(inputs, True)
+    
+    def __process(self, inputs, block):
+        worker_tasks = [[] for _ in range(len(self.__pool))]
+        for stream_id, input_ in inputs.items():
+            worker_tasks[self.__owners[stream_id]].append((stream_id, input_))
+        
+        outputs = {}
+        for tasks, worker_outputs in zip(worker_tasks, self.__pool.execute(worker_tasks, block)):
+            outputs.update(zip((stream_id for stream_id, _ in tasks), worker_outputs))
+        
+        return outputs
+    
+    def close(self):
+        """Terminates the worker processes."""
+        self.__pool.close()
+
+_EXECUTORS = {"thread": threaded_network_channel,
+              "process": process_network_channel,
+              "async": lambda plan, workers: async_network_channel(plan)}
 
 class NameConflictError(Exception):
     def __init__(self, value):
@@ -7,13 +7,16 @@ sum_channel -- outputs the sum of the input
 moving_average_channel - outputs the moving average over a given number of inputs
 inverse_channel -- outputs the negative of the summed input
 process_sequence -- helper function to process a sequence of inputs on a channel
+process_stream -- helper function to process an iterable of inputs on a channel in chunks
 
 See also modular.channels.channels
 
 """
-from .channels import memoryless_channel, multi_input_channel
+from .channels import memoryless_channel, multi_input_channel, deterministic, Channel, memoryless
 from .channels import process_sequence as process
-from ._util import identity, start
+from .channels import process_stream as stream
+from ._util import identity, compose
+import math
 import numpy as np
 
 
@@ -25,48 +28,168 @@ def _sum(value):
     except TypeError:
         return value
 
+@deterministic
+@memoryless
 def sum_channel():
     """Returns an initialized generator that outputs the sum over the input."""
     return memoryless_channel(_sum)
 
 
-@start
-def _single_input_moving_average_channel(n, initial_values = [], operation = identity, zero_val=0):
+def _single_input_moving_average_channel(n, initial_values = [], operation = identity, zero_val=0, stable=False):
     init = list(initial_values)
-    init_value_count = len(init)
-    if init_value_count > n:
+    if len(init) > n:
         raise ValueError("There can be at most {0} initial values: {1} where given ".format(n, len(initial_values)))
     
-    buffer = init + [zero_val] * (n - init_value_count)
-    count = 0
-    mean = np.mean(buffer, axis=0)
-    while True:
-        input_ = operation((yield mean))
+    return _MovingAverageChannel(n, init + [zero_val] * (n - len(init)), operation, stable)
+
+
+def _window_mean(window):
+    #Scalar windows are summed exactly, array windows element wise
+    window = np.asarray(window)
+    if window.ndim == 1:
+        return np.float64(math.fsum(window.tolist()) / len(window))
+    
+    return np.sum(window, axis=0) / len(window)
+
+
+class _MovingAverageChannel(Channel):
+    __slots__ = ("_n", "_buffer", "_count", "_mean", "_operation", "_stable")
+    
+    def __init__(self, n, buffer, operation, stable):
+        self._n = n
+        self._buffer = buffer
+        self._count = 0
+        self._mean = np.mean(buffer, axis=0)
+        self._operation = operation
+        self._stable = stable
+        
+    def send(self, value):
+        operation = self._operation
+        input_ = value if operation is identity else operation(value)
+        buffer, count, n = self._buffer, self._count, self._n
         
-        mean = mean + (input_ - buffer[count]) / n
+        mean = self._mean + (input_ - buffer[count]) / n
         
         buffer[count] = input_
-        count = (count + 1) % n
+        count += 1
+        if count == n:
+            count = 0
+            #The buffer is in the order of the inputs whenever the count wraps
+            if self._stable:
+                mean = _window_mean(buffer)
+        
+        self._count = count
+        self._mean = mean
+        
+        return mean
+    
+    def send_many(self, inputs):
+        n = self._n
+        if self._operation is identity:
+            values = np.asarray(inputs)
+        else:
+            values = np.asarray([self._operation(input_) for input_ in inputs])
+        
+        block_length = len(values)
+        if not block_length:
+            return np.empty((0, ) + np.shape(self._mean))
+        
+        sample_shape = np.broadcast_shapes(values.shape[1:], np.shape(self._mean))
+        
+        #The values leaving the window, starting with the oldest one
+        count = self._count
+        buffer = self._buffer[count:] + self._buffer[:count]
+        leaving = np.empty((block_length, ) + sample_shape, dtype=np.result_type(values, self._mean))
+        head = min(n, block_length)
+        for i in range(head):
+            leaving[i] = buffer[i]
+        leaving[head:] = values[:block_length - head]
+        
+        #Accumulating the updates starting from the current mean reproduces
+        #the rounding of the sample by sample updates
+        updates = np.empty((block_length + 1, ) + sample_shape, dtype=np.result_type(self._mean, float))
+        updates[0] = self._mean
+        np.divide(values - leaving, n, out=updates[1:])
+        
+        if not self._stable:
+            means = np.add.accumulate(updates, axis=0)[1:]
+        else:
+            means = self.__accumulate_stable(updates, buffer, values)
+        
+        self._mean = means[-1].copy()
+        
+        #Keep the position of the count, so that a stable channel recomputes
+        #its mean at the same inputs as in sample by sample processing
+        window = buffer[block_length:] + list(np.array(values[max(0, block_length - n):]))
+        self._count = (count + block_length) % n
+        self._buffer = window[n - self._count:] + window[:n - self._count]
+        
+        return means
+    
+    def __accumulate_stable(self, updates, buffer, values):
+        n = self._n
+        means = updates[1:]
+        start = 0
+        for wrap in range((n - self._count - 1) % n, len(means), n):
+            np.add.accumulate(updates[start:wrap + 2], axis=0, out=updates[start:wrap + 2])
+            if wrap + 1 < n:
+                window = buffer[wrap + 1:] + list(values[:wrap + 1])
+            else:
+                window = values[wrap + 1 - n:wrap + 1]
+            means[wrap] = _window_mean(window)
+            start = wrap + 1
+        
+        np.add.accumulate(updates[start:], axis=0, out=updates[start:])
+        
+        return means
+    
+    def snapshot(self):
+        #Scalar states are kept as Python numbers, which are much cheaper to
+        #pickle than many small arrays
+        if np.ndim(self._mean):
+            return {"buffer": np.array(self._buffer), "count": self._count, "mean": self._mean.copy()}
+        
+        return {"buffer": list(self._buffer), "count": self._count, "mean": self._mean.item()}
+    
+    def restore(self, state):
+        if len(state["buffer"]) != self._n:
+            raise ValueError("The state is not a state of a moving average over {0} inputs".format(self._n))
+        
+        mean = np.array(state["mean"])
+        self._buffer = list(np.array(state["buffer"])) if mean.ndim else list(state["buffer"])
+        self._count = state["count"]
+        self._mean = mean if mean.ndim else mean[()]
+    
+    def _fuse_input(self, operation):
+        self._operation = compose(self._operation, operation)
 
 
+@deterministic
 @multi_input_channel(sum_channel)
-def moving_average_channel(n, initial_values = [], operation = identity, zero_val=0):
-    """Returns a generator that returns the moving average over n elements preceeding its input.
+def moving_average_channel(n, initial_values = [], operation = identity, zero_val=0, stable=False):
+    """Returns a channel that returns the moving average over n elements preceeding its input.
+    
+    The channel processes blocks of inputs natively (See send_many in
+    modular.channels.channels).
     
     Keyword arguments:
     
     initial_values -- At most n default values for the first iterations (default empty)
     operation -- a function that operates on the inputs to the generator (default identity)
     zero_value -- zero like value used to initialize the channel
+    stable -- recompute the average from the last n inputs every n inputs,
+              which bounds the accumulated rounding error (default False)
     
     """ 
-    return _single_input_moving_average_channel(n, initial_values, operation, zero_val)
+    return _single_input_moving_average_channel(n, initial_values, operation, zero_val, stable)
 
 
 def _inverse(value):
     return - value
 
 
+@deterministic
+@memoryless
 @multi_input_channel(sum_channel)
 def inverse_channel(n):
     """Returns an initialized generator that outputs the negative of the summed input."""
@@ -84,4 +207,16 @@ def process_sequence(channel, input_sequence):
     None values in the output are converted to zeros.
     
     """
-    return process(channel, input_sequence, iter(int, 1), 0)#"infinite generator of zeros")))
\ No newline at end of file
+    return process(channel, input_sequence, iter(int, 1), 0)#"infinite generator of zeros")))
+
+
+def process_stream(channel, inputs, chunk_size=1024, flush=0):
+    """Returns a generator of chunks of outputs for the given iterable of inputs.
+    
+    The generator terminates after the inputs and flush additional zeros are
+    processed. None values in the output are converted to zeros.
+    
+    See also process_stream in modular.channels.channels
+    
+    """
+    return stream(channel, inputs, chunk_size, flush, 0, 0)
\ No newline at end of file
@@ -0,0 +1,119 @@
+"""Channels that process many independent numeric streams at once.
+
+The state of all streams is kept in a single array with one column per
+stream. Each input is a sequence with one number per stream, the output is an
+array with one output per stream. Sending the input advances all streams,
+which replaces one channel per stream by a single channel.
+
+moving_average_channel -- outputs the moving averages over a given number of inputs of each stream
+shift_channel -- outputs the inputs of each stream shifted against the input
+
+See also modular.channels.channels, modular.numeric_channels
+
+"""
+from .array_channels import _MovingAverageChannel
+from .channels import deterministic, Channel
+from ._util import identity
+import numpy as np
+
+
+@deterministic
+def moving_average_channel(streams, n, initial_values = (), zero_val=0, stable=False, out=None):
+    """Returns a channel that returns the moving average over n elements preceeding its input for each stream.
+    
+    The channel behaves like a moving_average_channel in numeric_channels
+    for each stream, except that it accepts exactly one number per stream.
+    
+    Keyword arguments:
+    
+    initial_values -- At most n default values for the first iterations,
+                      each a number or one number per stream (default empty)
+    zero_value -- zero like value used to initialize the channel (default = 0)
+    stable -- recompute the averages from the last n inputs every n inputs,
+              which bounds the accumulated rounding error (default False)
+    out -- array into which the averages are written and which is returned
+           as output on each call to send (default None)
+    
+    """
+    init = [np.broadcast_to(value, (streams, )) for value in initial_values]
+    if len(init) > n:
+        raise ValueError("There can be at most {0} initial values: {1} where given ".format(n, len(initial_values)))
+    
+    buffer = init + [np.broadcast_to(zero_val, (streams, ))] * (n - len(init))
+    
+    return _MovingAverageChannel(n, buffer, identity, stable, out)
+
+
+@deterministic
+def shift_channel(streams, n, initial_values = (), zero_val=0, dtype=float, out=None):
+    """Returns a channel that returns its input shifted by n iterations against its input for each stream.
+    
+    The channel behaves like a shift_channel in channels for each stream.
+    The inputs are stored in an array of the given dtype.
+    
+    Keyword arguments:
+    
+    initial_values -- At most n default outputs for the first iterations,
+                      each a number or one number per stream (default empty)
+    zero_value -- zero like value used to initialize the channel (default = 0)
+    dtype -- the type of the stored inputs (default float)
+    out -- array into which the outputs are written and which is returned
+           as output on each call to send (default None)
+    
+    """
+    init = [np.broadcast_to(value, (streams, )) for value in initial_values]
+    if len(init) > n:
+        raise ValueError("There can be at most {0} initial values: {1} where given ".format(n, len(initial_values)))
+    
+    return _ShiftChannel(streams, n, init, zero_val, dtype, out)
+
+
+class _ShiftChannel(Channel):
+    __slots__ = ("_length", "_buffer", "_rows", "_count", "_out")
+    
+    def __init__(self, streams, n, initial_values, zero_val, dtype, out):
+        self._length = n + 1
+        self._buffer = np.empty((n + 1, streams), dtype=dtype)
+        self._buffer[:] = zero_val
+        if len(initial_values):
+            self._buffer[n - len(initial_values):n] = initial_values
+        self._rows = list(self._buffer)
+        self._count = n
+        self._out = out
+        
+    def send(self, value):
+        np.copyto(self._rows[self._count], value)
+        self._count = (self._count + 1) % self._length
+        
+        if self._out is None:
+            return self._rows[self._count].copy()
+        
+        np.copyto(self._out, self._rows[self._count])
+        
+        return self._out
+    
+    def send_many(self, inputs):
+        values = np.asarray(inputs, dtype=self._buffer.dtype)
+        block_length = len(values)
+        if not block_length:
+            return np.empty((0, ) + self._buffer.shape[1:], dtype=self._buffer.dtype)
+        
+        #The values pending for output, starting with the oldest one
+        count = self._count
+        history = np.concatenate((self._buffer[count + 1:], self._buffer[:count], values))
+        
+        self._buffer[:-1] = history[block_length:]
+        self._buffer[-1] = history[block_length - 1]
+        self._count = self._length - 1
+        
+        return history[:block_length]
+    
+    def snapshot(self):
+        return {"buffer": self._buffer.copy(), "count": self._count}
+    
+    def restore(self, state):
+        if np.shape(state["buffer"]) != self._buffer.shape:
+            raise ValueError("The state is not a state of a shift channel of shape {0}".format(self._buffer.shape))
+        
+        np.copyto(self._buffer, state["buffer"])
+        self._count = state["count"]
@@ -1,49 +1,94 @@
 """Channels that process string input.
 
 All channels accept either a single string or a sequence of strings as input.
-The output maybe truncated if it becomes unreasonably large.
+Instead of strings, bytes like objects, that is bytes, bytearray or
+memoryview, can be processed without decoding, the output is then bytes.
+The output is truncated to at most max_length characters or bytes, which is
+a keyword argument of every channel. Inputs beyond max_length are not
+copied, so the cost of a call is bounded by max_length rather than by the
+size of the input.
 
 sum_channel -- outputs the concatenate the strings in the input
 delay_channel -- outputs the previous summed input strings 
 echo channel -- outputs the summed input concatenated with itself
 reverse_channel -- outputs the reverse summed input
 process_sequence -- helper function to process a sequence of inputs on a channel
+process_stream -- helper function to process an iterable of inputs on a channel in chunks
 
 See also modular.channels.channels
 
 """
-from .channels import shift_channel, memoryless_channel, multi_input_channel
+from .channels import shift_channel, memoryless_channel, multi_input_channel, deterministic, memoryless
 from .channels import process_sequence as process
+from .channels import process_stream as stream
+from functools import partial
 
 DELAY_INITIAL = "hello"
 
 _MAX_LENGTH = 10000
 
-def _sum(value):
-    return "".join(value)[:_MAX_LENGTH]
+_BYTES_TYPES = (bytes, bytearray, memoryview)
 
-def sum_channel():
+def _sum(value, max_length=_MAX_LENGTH):
+    if isinstance(value, str):
+        return value[:max_length]
+    
+    if isinstance(value, _BYTES_TYPES):
+        return bytes(value[:max_length])
+    
+    #Joining stops at max_length, the last string is sliced before joining
+    pieces = []
+    remaining = max_length
+    for piece in value:
+        if len(piece) >= remaining:
+            pieces.append(piece[:remaining])
+            break
+        pieces.append(piece)
+        remaining -= len(piece)
+    
+    if pieces and not isinstance(pieces[0], str):
+        return b"".join(pieces)
+    
+    return "".join(pieces)
+
+def _with_max_length(operation, max_length):
+    #Calling a partial with a keyword argument costs more than the operation
+    #on short strings, the default maximum length needs no partial
+    if max_length == _MAX_LENGTH:
+        return operation
+    
+    return partial(operation, max_length=max_length)
+
+@deterministic
+@memoryless
+def sum_channel(max_length=_MAX_LENGTH):
     """Returns an initialized generator that outputs the concatenated strings in the input."""
-    return memoryless_channel(_sum)
+    return memoryless_channel(_with_max_length(_sum, max_length))
 
-@multi_input_channel(sum_channel)
-def delay_channel():
+@deterministic
+@multi_input_channel(sum_channel, sum_args=("max_length", ))
+def delay_channel(max_length=_MAX_LENGTH):
     """Returns an initialized generator that outputs the previous summed input."""
     return shift_channel(1, [DELAY_INITIAL])
     
-def _echo(value):
-    return (value * 2)[:_MAX_LENGTH]
+def _echo(value, max_length=_MAX_LENGTH):
+    #The echo is sliced before concatenating, so at most max_length is copied
+    return value[:max_length] + value[:max(0, max_length - len(value))]
         
-@multi_input_channel(sum_channel)
-def echo_channel():
+@deterministic
+@memoryless
+@multi_input_channel(sum_channel, sum_args=("max_length", ))
+def echo_channel(max_length=_MAX_LENGTH):
     """Returns an initialized generator that outputs the summed input concatenated with itself."""
-    return memoryless_channel(_echo)
+    return memoryless_channel(_with_max_length(_echo, max_length))
     
 def _reverse(value):
     return value[::-1]
 
-@multi_input_channel(sum_channel)
-def reverse_channel():
+@deterministic
+@memoryless
+@multi_input_channel(sum_channel, sum_args=("max_length", ))
+def reverse_channel(max_length=_MAX_LENGTH):
     """Returns an initialized generator that outputs the summed input reversed."""
     return memoryless_channel(_reverse)
 
@@ -58,4 +103,17 @@ def process_sequence(channel, input_sequence):
     strings. None values in the output are converted to empty strings.
     
     """
-    return process(channel, input_sequence, iter(str, "infinite generator of empty strings"), "")
\ No newline at end of file
+    return process(channel, input_sequence, iter(str, "infinite generator of empty strings"), "")
+
+
+def process_stream(channel, inputs, chunk_size=1024, flush=0):
+    """Returns a generator of chunks of outputs for the given iterable of inputs.
+    
+    The generator terminates after the inputs and flush additional empty
+    strings are processed. None values in the output are converted to empty
+    strings.
+    
+    See also process_stream in modular.channels.channels
+    
+    """
+    return stream(channel, inputs, chunk_size, flush, "", "")
\ No newline at end of file
@@ -1,7 +1,11 @@
-from ..array_channels import sum_channel, moving_average_channel
+from ..array_channels import sum_channel, accumulating_sum_channel, moving_average_channel, process_stream, process_file
+from tempfile import TemporaryDirectory
+import os
 from unittest import TestCase, main
 import numpy as np
 from numpy.testing import assert_array_equal
+from .base import BlockTestCase, SnapshotTestCase
+from ..channels import send_many, snapshot, restore
 
 class ChannelTestCase():
     def test_single(self):
@@ -60,8 +64,34 @@ class SumTestCase(TestCase, ChannelTestCase, NoInputTestCase, MemorylessTestCase
         self.expected_no_input = ()
         self.empty_val = ()
 
-class MovingAverageTestCase(TestCase, ChannelTestCase, NoInputTestCase):
+class AccumulatingSumTestCase(SumTestCase):
     def setUp(self):
+        super().setUp()
+        self.channel = accumulating_sum_channel()
+        
+    def test_send_many(self):
+        block_input = [(1, 2, 3), ((1, 2, 3), (4, 5, 6)), ((1, 2, 3), (4, 5, 6), (7, 8, 9))]
+        
+        output = send_many(self.channel, block_input)
+        
+        assert_array_equal(output, ((1, 2, 3), (5, 7, 9), (12, 15, 18)))
+        
+    def test_accumulator_reused(self):
+        first = self.channel.send(self.tuple_input)
+        second = self.channel.send(self.tuple_input[::-1])
+        
+        self.assertIs(first, second)
+        assert_array_equal(second, self.expected_tuple_input)
+        
+    def test_type_promotion(self):
+        output = self.channel.send(((1, 2), (3, 4), (0.5, 0.25)))
+        
+        assert_array_equal(output, (4.5, 6.25))
+
+class MovingAverageTestCase(TestCase, ChannelTestCase, NoInputTestCase, BlockTestCase, SnapshotTestCase):
+    def setUp(self):
+        self.create_channel = lambda: moving_average_channel(3, ((1, 1, 1), (0, 2, 0), (3, 3, 3)))
+        self.block_input = [(4, 8, 16), ((0.1, 0.2, 0.3), (4, 6, 8)), (1e6, 1, 1), (7, 8, 9.5)]
         self.channel = moving_average_channel(4)
         self.single_input = (4, 8, 16)
         self.tuple_input = ((1, 2, 3), (4, 6, 8), (7, 8, 9))
@@ -91,5 +121,109 @@ class MovingAverageTestCase(TestCase, ChannelTestCase, NoInputTestCase):
         assert_array_equal(expected_avg_input, averages_input)
         assert_array_equal(expected_avg_zeros, averages_zeros)
         
+    def test_output_array(self):
+        out = np.empty(3)
+        channel = moving_average_channel(2, out=out)
+        
+        output = channel.send((2, 4, 6))
+        
+        self.assertIs(output, out)
+        assert_array_equal(out, (1, 2, 3))
+        
+    def test_outputs_are_independent(self):
+        first = self.channel.send((4, 4, 4))
+        second = self.channel.send((4, 4, 4))
+        
+        assert_array_equal(first, (1, 1, 1))
+        assert_array_equal(second, (2, 2, 2))
+        
+    def test_outputs_are_independent_of_blocks(self):
+        first = self.channel.send((4, 4, 4))
+        send_many(self.channel, [(4, 4, 4)])
+        
+        assert_array_equal(first, (1, 1, 1))
+        
+    def test_initial_values_and_zeros(self):
+        channel = moving_average_channel(2, ((2, 4, 6), ))
+        
+        assert_array_equal(channel.send((2, 4, 6)), (1, 2, 3))
+        assert_array_equal(channel.send((0, 0, 0)), (1, 2, 3))
+
+    def test_snapshot_before_input(self):
+        restored = self.create_channel()
+        
+        restore(restored, snapshot(self.create_channel()))
+        
+        assert_array_equal(restored.send((1, 1, 1)), self.create_channel().send((1, 1, 1)))
+        
+    def test_restore_other_length(self):
+        self.channel.send((1, 2, 3))
+        
+        self.assertRaises(ValueError, restore, moving_average_channel(3), snapshot(self.channel))
+
+class StableMovingAverageTestCase(MovingAverageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.create_channel = lambda: moving_average_channel(3, ((1, 1, 1), (0, 2, 0), (3, 3, 3)), stable=True)
+        self.channel = moving_average_channel(4, stable=True)
+
+class ProcessStreamTestCase(TestCase):
+    def test_process_stream(self):
+        inputs = np.ones((5, 3)) * np.arange(1, 6)[:, np.newaxis]
+        
+        chunks = list(process_stream(moving_average_channel(1), inputs, chunk_size=2))
+        
+        self.assertEqual(len(chunks), 3)
+        assert_array_equal(np.concatenate(chunks), inputs)
+        
+    def test_flush(self):
+        inputs = [(1, 2, 3), (3, 4, 5)]
+        
+        chunks = list(process_stream(moving_average_channel(2), inputs, flush=2, flush_val=np.zeros(3)))
+        
+        assert_array_equal(np.concatenate(chunks), [(0.5, 1, 1.5), (2, 3, 4), (1.5, 2, 2.5), (0, 0, 0)])
+
+class ProcessFileTestCase(TestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.input_file = os.path.join(self.directory.name, "input.npy")
+        self.output_file = os.path.join(self.directory.name, "output.npy")
+        self.inputs = np.random.random((100, 3))
+        np.save(self.input_file, self.inputs)
+        
+        reference = moving_average_channel(4)
+        self.expected = [reference.send(input_) for input_ in self.inputs]
+        
+    def tearDown(self):
+        self.directory.cleanup()
+        
+    def test_process_file(self):
+        count = process_file(moving_average_channel(4), self.input_file, self.output_file, block_size=7)
+        
+        self.assertEqual(count, 100)
+        assert_array_equal(np.load(self.output_file), self.expected)
+        
+    def test_empty(self):
+        np.save(self.input_file, np.empty((0, 3)))
+        
+        count = process_file(moving_average_channel(4), self.input_file, self.output_file)
+        
+        self.assertEqual(count, 0)
+        self.assertEqual(np.load(self.output_file).shape, (0, 3))
+        
+    def test_resume(self):
+        process_file(moving_average_channel(4), self.input_file, self.output_file)
+        outputs = np.load(self.output_file, mmap_mode="r+")
+        outputs[50:] = 0
+        outputs.flush()
+        del outputs
+        
+        channel = moving_average_channel(4)
+        send_many(channel, self.inputs[:50])
+        count = process_file(channel, self.input_file, self.output_file, block_size=16, offset=50)
+        
+        self.assertEqual(count, 50)
+        assert_array_equal(np.load(self.output_file), self.expected)
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
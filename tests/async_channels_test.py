@@ -0,0 +1,89 @@
+from ..async_channels import async_channel, async_memoryless_channel, async_start
+from ..network import NetworkDefinition, NetworkFactory
+from ..string_channels import reverse_channel, delay_channel, DELAY_INITIAL
+from ..channels import shift_channel
+from functools import partial
+from unittest import TestCase, main
+import asyncio
+
+def run(coroutine):
+    return asyncio.run(asyncio.wait_for(coroutine, 5))
+
+async def process(channel, inputs):
+    return [await channel.asend(input_) for input_ in inputs]
+
+@async_start
+async def async_shift_channel():
+    previous, current = None, None
+    while True:
+        previous, current = current, (yield previous)
+
+class AsyncChannelTestCase(TestCase):
+    def test_async_channel(self):
+        channel = async_channel(shift_channel(1, ["initial"]))
+        
+        self.assertEqual(run(process(channel, ("one", "two"))), ["initial", "one"])
+        
+    def test_memoryless_function(self):
+        channel = async_memoryless_channel(str.upper)
+        
+        self.assertEqual(run(process(channel, ("one", "two"))), ["ONE", "TWO"])
+        
+    def test_memoryless_coroutine_function(self):
+        async def upper(value):
+            await asyncio.sleep(0)
+            return value.upper()
+        
+        channel = async_memoryless_channel(upper)
+        
+        self.assertEqual(run(process(channel, ("one", "two"))), ["ONE", "TWO"])
+        
+    def test_async_start(self):
+        channel = async_shift_channel()
+        
+        self.assertEqual(run(process(channel, ("one", "two"))), [None, "one"])
+
+class AsyncNetworkTestCase(TestCase):
+    def setUp(self):
+        self.event = asyncio.Event()
+        
+        async def wait(value):
+            await self.event.wait()
+            return "".join(value)
+        
+        def notify(value):
+            self.event.set()
+            return "".join(value)
+        
+        async def async_notify(value):
+            return notify(value)
+        
+        self.factory = NetworkFactory({"reverse": reverse_channel,
+                                       "delay": delay_channel,
+                                       "wait": partial(async_memoryless_channel, wait),
+                                       "notify": partial(async_memoryless_channel, async_notify)})
+        
+    def test_network(self):
+        definition = NetworkDefinition(self.factory.available_channel_types())
+        definition.add_module("in", "reverse")
+        definition.add_module("wait", "wait")
+        definition.add_module("notify", "notify")
+        definition.add_module("out", "delay")
+        definition.add_connection("in", "wait")
+        definition.add_connection("in", "notify")
+        definition.add_connection("wait", "out")
+        definition.add_connection("notify", "out")
+        
+        network = self.factory.create(definition, "async")()
+        
+        #The wait module only finishes when the notify module of the same
+        #level is awaited concurrently 
+        self.assertEqual(run(process(network, ("abc", "de"))), [DELAY_INITIAL, "cbacba"])
+        
+    def test_empty(self):
+        network = self.factory.create(NetworkDefinition(()), "async")()
+        
+        self.assertEqual(run(network.asend("test")), None)
+
+if __name__ == "__main__":
+    main()
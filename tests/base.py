@@ -1,3 +1,8 @@
+from ..channels import send_many, snapshot, restore
+import pickle
+from numpy.testing import assert_array_equal
+import numpy as np
+
 class ChannelTestCase():
     def test_single(self):
         output = self.channel.send(self.single_input)
@@ -43,3 +48,49 @@ class MemorylessTestCase(object):
             value = self.channel.send(self.tuple_input)
             self.assertEqual(value, self.expected_tuple_input, "Failed at {0}".format(i))
 
+
+class BlockTestCase(object):
+    def test_send_many(self):
+        reference = self.create_channel()
+        expected = [reference.send(input_) for input_ in self.block_input]
+        
+        output = send_many(self.create_channel(), self.block_input)
+        
+        assert_array_equal(np.asarray(output), np.asarray(expected))
+
+    def test_send_many_carries_state(self):
+        reference = self.create_channel()
+        expected = [reference.send(input_) for input_ in self.block_input * 3]
+        
+        channel = self.create_channel()
+        output = list(send_many(channel, self.block_input[:1]))
+        output += [channel.send(input_) for input_ in self.block_input[1:]]
+        output += list(send_many(channel, ()))
+        output += list(send_many(channel, self.block_input * 2))
+        
+        assert_array_equal(np.asarray(output), np.asarray(expected))
+
+class SnapshotTestCase(object):
+    def test_snapshot_restore(self):
+        reference = self.create_channel()
+        expected = [reference.send(input_) for input_ in self.block_input * 2]
+        
+        channel = self.create_channel()
+        output = [channel.send(input_) for input_ in self.block_input]
+        state = pickle.loads(pickle.dumps(snapshot(channel)))
+        restored = self.create_channel()
+        restore(restored, state)
+        output += [restored.send(input_) for input_ in self.block_input]
+        
+        assert_array_equal(np.asarray(output), np.asarray(expected))
+        
+    def test_snapshot_is_copy(self):
+        channel = self.create_channel()
+        send_many(channel, self.block_input)
+        state = snapshot(channel)
+        expected = [channel.send(input_) for input_ in self.block_input]
+        
+        restore(channel, state)
+        output = list(send_many(channel, self.block_input))
+        
+        assert_array_equal(np.asarray(output), np.asarray(expected))
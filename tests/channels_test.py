@@ -0,0 +1,192 @@
+from ..channels import gate_channel, select_channel, memoryless_channel, memoryless, is_memoryless, \
+    lazy_inputs, is_lazy_inputs, deterministic, is_deterministic, cached_memoryless_channel, cached_channel, \
+    cached, CacheInfo, snapshot
+from ..channels import concatenate, shift_channel, send_many
+from ..string_channels import reverse_channel, delay_channel
+from .. import numeric_channels
+from functools import partial
+import pickle
+from unittest import TestCase, main
+
+class GateTestCase(TestCase):
+    def setUp(self):
+        self.channel = gate_channel()
+        
+    def test_open(self):
+        self.assertEqual(self.channel.send((True, "value")), "value")
+        
+    def test_closed(self):
+        self.assertIsNone(self.channel.send((0, "value")))
+        
+    def test_zero_val(self):
+        self.assertEqual(gate_channel(0).send((False, 5)), 0)
+        
+    def test_closed_does_not_read_value(self):
+        inputs = _ReadOnce((False, ))
+        
+        self.assertIsNone(self.channel.send(inputs))
+
+class SelectTestCase(TestCase):
+    def setUp(self):
+        self.channel = select_channel()
+        
+    def test_select(self):
+        self.assertEqual(self.channel.send((1, "zero", "one", "two")), "one")
+        self.assertEqual(self.channel.send((0, "zero", "one", "two")), "zero")
+        
+    def test_out_of_range(self):
+        self.assertRaises(IndexError, self.channel.send, (3, "zero", "one", "two"))
+
+class DeclarationTestCase(TestCase):
+    def test_builtin(self):
+        for channel_function in (gate_channel, select_channel):
+            self.assertTrue(is_memoryless(channel_function))
+            self.assertTrue(is_lazy_inputs(channel_function))
+            self.assertTrue(is_deterministic(channel_function))
+            
+    def test_partial(self):
+        self.assertTrue(is_memoryless(partial(memoryless_channel, abs)))
+        
+    def test_declare(self):
+        @memoryless
+        @lazy_inputs
+        def channel():
+            return memoryless_channel()
+        
+        self.assertTrue(is_memoryless(channel))
+        self.assertTrue(is_lazy_inputs(channel))
+        self.assertFalse(is_deterministic(channel))
+        self.assertTrue(is_deterministic(deterministic(channel)))
+
+class CachedMemorylessTestCase(TestCase):
+    def setUp(self):
+        self.calls = []
+        self.channel = cached_memoryless_channel(self.__operation, 2)
+        
+    def __operation(self, value):
+        self.calls.append(value)
+        
+        return str(value)
+        
+    def test_send(self):
+        output = [self.channel.send(value) for value in (1, 2, 1, 1, 2)]
+        
+        self.assertEqual(output, ["1", "2", "1", "1", "2"])
+        self.assertEqual(self.calls, [1, 2])
+        self.assertEqual(self.channel.cache_info(), CacheInfo(3, 2, 2, 2))
+        
+    def test_least_recently_used(self):
+        for value in (1, 2, 1, 3, 1, 2):
+            self.channel.send(value)
+        
+        self.assertEqual(self.calls, [1, 2, 3, 2])
+        
+    def test_list(self):
+        self.channel.send([1, 2])
+        
+        self.assertEqual(self.channel.send([1, 2]), "[1, 2]")
+        self.assertEqual(self.calls, [[1, 2]])
+        
+    def test_iterator(self):
+        self.assertEqual(self.channel.send(iter((1, 2))), "(1, 2)")
+        self.assertEqual(self.channel.send(value for value in (1, 2)), "(1, 2)")
+        self.assertEqual(self.calls, [(1, 2)])
+        
+    def test_unhashable(self):
+        self.channel.send({1: 2})
+        self.channel.send({1: 2})
+        
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(self.channel.cache_info(), CacheInfo(0, 2, 2, 0))
+        
+    def test_cache_clear(self):
+        self.channel.send(1)
+        self.channel.cache_clear()
+        self.channel.send(1)
+        
+        self.assertEqual(self.calls, [1, 1])
+        self.assertEqual(self.channel.cache_info(), CacheInfo(0, 1, 2, 1))
+        
+    def test_size(self):
+        self.assertRaises(ValueError, cached_memoryless_channel, str, 0)
+        
+    def test_snapshot(self):
+        self.assertEqual(snapshot(self.channel), {})
+        
+    def test_cached_channel(self):
+        channel = cached_channel(reverse_channel(), 8)
+        
+        self.assertEqual(channel.send(("one", "two")), "owteno")
+        self.assertEqual(channel.send(["one", "two"]), "owteno")
+        self.assertEqual(channel.cache_info().hits, 1)
+        
+    def test_cached(self):
+        channel_function = cached(reverse_channel, 8)
+        
+        self.assertTrue(is_memoryless(channel_function))
+        self.assertTrue(is_deterministic(channel_function))
+        self.assertFalse(is_deterministic(cached(memoryless_channel)))
+        self.assertEqual(channel_function().send("one"), "eno")
+        self.assertEqual(channel_function().cache_info().max_size, 8)
+
+class ConcatenateTestCase(TestCase):
+    def test_memoryless(self):
+        channel = concatenate(partial(memoryless_channel, abs), partial(memoryless_channel, str))()
+        
+        self.assertIs(type(channel), type(memoryless_channel()))
+        self.assertEqual(channel.send(-3), "3")
+        
+    def test_identity(self):
+        shift = type(shift_channel(1))
+        
+        self.assertIs(type(concatenate(memoryless_channel, shift_channel, args_2=((1, ), {}))()), shift)
+        self.assertIs(type(concatenate(shift_channel, memoryless_channel, args_1=((1, ), {}))()), shift)
+        
+    def test_shift(self):
+        channel = concatenate(partial(memoryless_channel, abs), shift_channel, args_2=((1, [0]), {}))()
+        
+        self.assertIsInstance(channel, type(shift_channel(1)))
+        self.assertEqual([channel.send(value) for value in (-1, -2)], [0, 1])
+        self.assertEqual(send_many(channel, (-3, 4)), [2, 3])
+        
+    def test_shift_with_operation(self):
+        channel = concatenate(partial(memoryless_channel, abs), shift_channel, args_2=((1, [0], str), {}))()
+        
+        self.assertEqual([channel.send(value) for value in (-1, -2)], [0, "1"])
+        
+    def test_moving_average(self):
+        channel = numeric_channels.moving_average_channel(2)
+        
+        self.assertIs(type(channel), type(numeric_channels._single_input_moving_average_channel(2)))
+        self.assertEqual(channel.send((1, 3)), 2)
+        self.assertEqual(list(send_many(channel, [(2, 2), 0])), [4, 2])
+        
+    def test_not_fused(self):
+        channel = concatenate(delay_channel, reverse_channel)()
+        
+        self.assertEqual([channel.send(value) for value in ("one", "two")], ["olleh", "eno"])
+
+class MultiInputTestCase(TestCase):
+    def test_pickle(self):
+        for channel in (numeric_channels.moving_average_channel, numeric_channels.inverse_channel):
+            self.assertIs(pickle.loads(pickle.dumps(channel)), channel)
+        
+    def test_name(self):
+        self.assertEqual(numeric_channels.inverse_channel.__name__, "inverse_channel")
+        
+    def test_sum_args(self):
+        self.assertEqual(reverse_channel(3).send(("ab", "cd")), "cba")
+        self.assertEqual(reverse_channel(max_length=3).send(("ab", "cd")), "cba")
+
+class _ReadOnce():
+    def __init__(self, values):
+        self.values = values
+        
+    def __getitem__(self, index):
+        if index >= len(self.values):
+            raise AssertionError("Input {0} was read".format(index))
+        
+        return self.values[index]
+
+if __name__ == "__main__":
+    main()
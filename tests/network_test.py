@@ -1,11 +1,20 @@
 from itertools import islice
 from .._module import Module
-from .._network import network_channel
+from .._network import network_channel, compile_network, compiled_network_channel
+from .._parallel import network_levels
 from ..network import NetworkDefinition, UndefinedNameError, \
-    NameConflictError, IllegalOrderError, NetworkFactory
+    NameConflictError, IllegalOrderError, NetworkFactory, NetworkPool, NetworkStats
 from ..string_channels import DELAY_INITIAL, sum_channel, \
     reverse_channel, delay_channel, process_sequence
-from .base import ChannelTestCase, NoInputTestCase
+from .base import ChannelTestCase, NoInputTestCase, BlockTestCase, SnapshotTestCase
+from .. import numeric_channels
+from ..channels import send_many, is_deterministic, snapshot, restore, memoryless_channel, memoryless, \
+    gate_channel, select_channel, CacheInfo
+from functools import partial
+from operator import eq
+from io import StringIO
+import json
+import math
 from unittest import TestCase, main
 
 class NetworkDefinitionTestCase(TestCase):
@@ -147,9 +156,50 @@ class NetworkFactoryTestCase(TestCase):
         
         return test_network.send("test")
         
+    def test_define_nested_and_use(self):
+        self.factory.define_channel_type("test", TEST_DEFINITION)
+        definition = NetworkDefinition(self.factory.available_channel_types())
+        definition.add_module("one", "test")
+        definition.add_module("two", "delay")
+        definition.add_connection("one", "two")
+        self.factory.define_channel_type("nested", definition)
+        
+        definition = NetworkDefinition(self.factory.available_channel_types())
+        definition.add_module("first", "sum")
+        definition.add_module("nested", "nested")
+        definition.add_module("last", "reverse")
+        definition.add_connection("first", "nested")
+        definition.add_connection("nested", "last")
+        definition.add_connection("first", "last")
+        
+        stats = NetworkStats()
+        test_network = self.factory.create(definition, profile=stats)()
+        outputs = [test_network.send(input_) for input_ in ("abc", "de")]
+        
+        self.assertEqual(outputs, ["cba" + DELAY_INITIAL[::-1], "ed" + "abc"])
+        self.assertEqual(stats.module_ids(), ["first",
+                                              ("nested", ("one", "one")),
+                                              ("nested", ("one", "two")),
+                                              ("nested", "two"),
+                                              "last"])
+        
     def test_define_with_name_conflict(self):
         self.assertRaisesRegex(NameConflictError, "sum", self.factory.define_channel_type, "sum", TEST_DEFINITION)
         
+    def test_nested_name_conflict(self):
+        nested = NetworkDefinition(self.factory.available_channel_types())
+        nested.add_module("x", "reverse")
+        self.factory.define_channel_type("nested", nested)
+        definition = NetworkDefinition(self.factory.available_channel_types())
+        definition.add_module("in", "sum")
+        definition.add_module("a", "nested")
+        definition.add_module(("a", "x"), "sum")
+        definition.add_module("out", "sum")
+        for from_module, to_module in (("in", "a"), ("in", ("a", "x")), ("a", "out"), (("a", "x"), "out")):
+            definition.add_connection(from_module, to_module)
+        
+        self.assertRaisesRegex(NameConflictError, "x", self.factory.create, definition)
+        
 MODULES = (Module("a", sum_channel), Module("b", reverse_channel), Module("c", delay_channel))
 CONNECTIONS = {"b": "a", "c": "b"}
 INCOMPLETE_CONNECTIONS = {"b": "a"}
@@ -187,10 +237,728 @@ class NetworkTestCase(TestCase, ChannelTestCase, NoInputTestCase):
         for _ in range(5):
             self.test_no_path_to_output()
         
+    def test_generator_methods(self):
+        self.assertRaises(ValueError, self.channel.throw, ValueError)
+        self.channel.close()
+        
     def __assert_processed(self, network, input_, expected):
         for i in range(0, len(expected)):
             value = network.send(input_[i])
             self.assertEqual(value, expected[i])
 
+class CompiledNetworkTestCase(NetworkTestCase, BlockTestCase, SnapshotTestCase):
+    def setUp(self):
+        super().setUp()
+        self.channel = compiled_network_channel(compile_network(MODULES, CONNECTIONS.copy()))
+        self.create_channel = partial(compiled_network_channel, compile_network(MODULES, CONNECTIONS.copy()))
+        self.block_input = ["hello", ("wor", "ld"), "", "!"]
+        
+    def test_compile(self):
+        plan = compile_network(MODULES, CONNECTIONS.copy())
+        
+        self.assertEqual(plan.ids, ("a", "b", "c"))
+        self.assertEqual(plan.inputs, ((), (0, ), (1, )))
+        
+    def test_no_path_to_output(self):
+        net = compiled_network_channel(compile_network(MODULES, INCOMPLETE_CONNECTIONS.copy()))
+
+        input_ = ("hello", "world", "", "", "", "")
+        expected = (DELAY_INITIAL, "", "", "", "")
+        
+        for i in range(0, len(expected)):
+            self.assertEqual(net.send(input_[i]), expected[i])
+
+    def test_start_multiple_times(self):
+        plan = compile_network(MODULES, CONNECTIONS.copy())
+        
+        for i in range(3):
+            net = compiled_network_channel(plan)
+            self.assertEqual(net.send("hello"), DELAY_INITIAL, "Failed at {0}".format(i))
+            self.assertEqual(net.send("world"), "olleh", "Failed at {0}".format(i))
+
+NUMERIC_CHANNELS = {"sum": numeric_channels.sum_channel,
+                    "average": partial(numeric_channels.moving_average_channel, 3),
+                    "long_average": partial(numeric_channels.moving_average_channel, 5, (1, 2)),
+                    "inverse": partial(numeric_channels.inverse_channel, 1)}
+
+def create_numeric_definition(channel_types):
+    definition = NetworkDefinition(channel_types)
+    definition.add_module("in", "sum")
+    definition.add_module("average", "average")
+    definition.add_module("unconnected", "long_average")
+    definition.add_module("inverse", "inverse")
+    definition.add_module("out", "long_average")
+    
+    definition.add_connection("in", "average")
+    definition.add_connection("in", "inverse")
+    definition.add_connection("average", "out")
+    definition.add_connection("inverse", "out")
+    definition.add_connection("unconnected", "out")
+    
+    return definition
+
+class NetworkBlockTestCase(TestCase, BlockTestCase, SnapshotTestCase):
+    def setUp(self):
+        factory = NetworkFactory(NUMERIC_CHANNELS)
+        definition = create_numeric_definition(NUMERIC_CHANNELS.keys())
+        self.create_channel = factory.create(definition)
+        self.block_input = [0.1, 7, (2, 3.5), 1e6, -3, 0.3, 11, 12, 0.7]
+        
+    def test_nested(self):
+        factory = NetworkFactory(NUMERIC_CHANNELS)
+        factory.define_channel_type("nested", create_numeric_definition(NUMERIC_CHANNELS.keys()))
+        definition = NetworkDefinition(factory.available_channel_types())
+        definition.add_module("one", "nested")
+        definition.add_module("two", "nested")
+        definition.add_connection("one", "two")
+        
+        reference = factory.create(definition)()
+        expected = [reference.send(input_) for input_ in self.block_input]
+        
+        output = send_many(factory.create(definition)(), self.block_input)
+        
+        self.assertEqual(list(output), expected)
+
+class NetworkSnapshotTestCase(TestCase):
+    def setUp(self):
+        self.factory = NetworkFactory(NUMERIC_CHANNELS)
+        self.definition = create_numeric_definition(NUMERIC_CHANNELS.keys())
+        self.inputs = [0.1, 7, (2, 3.5), 1e6, -3, 0.3]
+        
+        reference = self.factory.create(self.definition)()
+        self.expected = [reference.send(input_) for input_ in self.inputs * 2]
+        
+    def test_threaded(self):
+        network = self.factory.create(self.definition, "thread")()
+        restored = self.factory.create(self.definition, "thread")()
+        try:
+            output = [network.send(input_) for input_ in self.inputs]
+            restore(restored, snapshot(network))
+            output += [restored.send(input_) for input_ in self.inputs]
+        finally:
+            network.close()
+            restored.close()
+        
+        self.assertEqual(output, self.expected)
+        
+    def test_interpreted(self):
+        channel = network_channel(MODULES, CONNECTIONS.copy())
+        channel.send("hello")
+        restored = network_channel(MODULES, CONNECTIONS.copy())
+        
+        restore(restored, snapshot(channel))
+        
+        self.assertEqual(restored.send("world"), "olleh")
+        
+    def test_other_network(self):
+        network = self.factory.create(self.definition, prune=True, outputs=("average", ))()
+        
+        self.assertRaises(ValueError, restore, self.factory.create(self.definition)(), snapshot(network))
+        
+    def test_unsupported_channel(self):
+        self.assertRaises(TypeError, snapshot, NetworkFactory({}).create(NetworkDefinition([]))())
+
+class LazyNetworkTestCase(TestCase):
+    def setUp(self):
+        self.calls = {"expensive": 0, "stateful": 0}
+        self.channels = dict(NUMERIC_CHANNELS,
+                             positive=partial(memoryless_channel, lambda inputs: sum(inputs) > 0),
+                             expensive=memoryless(partial(memoryless_channel, partial(self.__count, "expensive"))),
+                             stateful=lambda: memoryless_channel(partial(self.__count, "stateful")),
+                             gate=gate_channel,
+                             select=select_channel)
+        self.factory = NetworkFactory(self.channels)
+        
+    def __count(self, name, inputs):
+        self.calls[name] += 1
+        
+        return sum(inputs) * 2
+        
+    def __gate_definition(self):
+        definition = NetworkDefinition(self.channels.keys())
+        for module_id, channel_type in (("in", "sum"), ("positive", "positive"), ("expensive", "expensive"),
+                                        ("stateful", "stateful"), ("out", "gate")):
+            definition.add_module(module_id, channel_type)
+        for from_module, to_module in (("in", "positive"), ("in", "expensive"), ("in", "stateful"),
+                                       ("positive", "out"), ("expensive", "out")):
+            definition.add_connection(from_module, to_module)
+        
+        return definition
+        
+    def test_outputs(self):
+        definition = create_numeric_definition(NUMERIC_CHANNELS.keys())
+        inputs = [0.1, 7, (2, 3.5), 1e6, -3, 0.3]
+        reference = self.factory.create(definition)()
+        expected = [reference.send(input_) for input_ in inputs * 2]
+        
+        network = self.factory.create(definition, lazy=True)()
+        output = [network.send(input_) for input_ in inputs]
+        output += list(send_many(network, inputs))
+        
+        self.assertEqual(output, expected)
+        
+    def test_selected_output_blocks(self):
+        definition = create_numeric_definition(NUMERIC_CHANNELS.keys())
+        inputs = [0.1, 7, (2, 3.5), 1e6, -3, 0.3]
+        reference = self.factory.create(definition, outputs=("average", "inverse"))()
+        expected = [list(block) for block in send_many(reference, inputs)]
+        
+        network = self.factory.create(definition, outputs=("average", "inverse"), lazy=True)()
+        averages, inverses = send_many(network, inputs)
+        
+        self.assertEqual([averages, inverses], expected)
+        self.assertEqual(send_many(network, []), ([], []))
+        
+    def test_gate(self):
+        network = self.factory.create(self.__gate_definition(), lazy=True)()
+        
+        output = [network.send(input_) for input_ in (1, -1, -2, 3)]
+        
+        self.assertEqual(output, [2, None, None, 6])
+        self.assertEqual(self.calls, {"expensive": 2, "stateful": 4})
+        
+    def test_not_lazy(self):
+        network = self.factory.create(self.__gate_definition())()
+        
+        output = [network.send(input_) for input_ in (1, -1, -2, 3)]
+        
+        self.assertEqual(output, [2, None, None, 6])
+        self.assertEqual(self.calls, {"expensive": 4, "stateful": 4})
+        
+    def test_select(self):
+        definition = NetworkDefinition(self.channels.keys())
+        for module_id, channel_type in (("in", "sum"), ("index", "positive"), ("inverse", "inverse"),
+                                        ("expensive", "expensive"), ("out", "select")):
+            definition.add_module(module_id, channel_type)
+        for from_module, to_module in (("in", "index"), ("in", "inverse"), ("in", "expensive"),
+                                       ("index", "out"), ("inverse", "out"), ("expensive", "out")):
+            definition.add_connection(from_module, to_module)
+        network = self.factory.create(definition, lazy=True)()
+        
+        output = [network.send(input_) for input_ in (1, -1, -2)]
+        
+        self.assertEqual(output, [2, 1, 2])
+        self.assertEqual(self.calls["expensive"], 1)
+        
+    def test_outputs_of_skipped_modules(self):
+        network = self.factory.create(self.__gate_definition(), lazy=True, outputs=("out", "expensive"))()
+        
+        self.assertEqual(network.send(-1), (None, -2))
+        
+    def test_long_chain(self):
+        definition = NetworkDefinition(self.channels.keys())
+        definition.add_module(0, "sum")
+        for i in range(1, 2000):
+            definition.add_module(i, "inverse")
+            definition.add_connection(i - 1, i)
+        network = self.factory.create(definition, lazy=True)()
+        
+        self.assertEqual(network.send(3), -3)
+        
+    def test_with_executor(self):
+        self.assertRaises(ValueError, self.factory.create, self.__gate_definition(), "thread", lazy=True)
+
+class IncrementalNetworkTestCase(TestCase):
+    def setUp(self):
+        self.calls = 0
+        self.channels = dict(NUMERIC_CHANNELS,
+                             double=memoryless(partial(memoryless_channel, self.__double)),
+                             buffer=self.__buffer_channel,
+                             first=memoryless(partial(memoryless_channel, lambda inputs: inputs[0][0])),
+                             positive=memoryless(partial(memoryless_channel, lambda inputs: inputs[0] > 0)))
+        self.factory = NetworkFactory(self.channels)
+        self.definition = NetworkDefinition(self.channels.keys())
+        for module_id, channel_type in (("in", "sum"), ("double", "double"), ("average", "average"), ("out", "sum")):
+            self.definition.add_module(module_id, channel_type)
+        for from_module, to_module in (("in", "double"), ("in", "average"), ("double", "out"), ("average", "out")):
+            self.definition.add_connection(from_module, to_module)
+        
+    def __double(self, inputs):
+        self.calls += 1
+        
+        return sum(inputs) * 2
+    
+    def __buffer_channel(self):
+        #Outputs the same list on every call, updated in place
+        buffer_ = [0]
+        def update(inputs):
+            buffer_[0] = sum(inputs)
+            
+            return buffer_
+        
+        return memoryless_channel(update)
+        
+    def test_outputs(self):
+        definition = create_numeric_definition(NUMERIC_CHANNELS.keys())
+        inputs = [0.1, 7, 7, (2, 3.5), 1e6, 1e6, -3, 0.3]
+        reference = self.factory.create(definition)()
+        expected = [reference.send(input_) for input_ in inputs * 2]
+        
+        for equal in (None, eq):
+            network = self.factory.create(definition, incremental=True, equal=equal)()
+            output = [network.send(input_) for input_ in inputs]
+            output += list(send_many(network, inputs))
+            
+            self.assertEqual(output, expected)
+        
+    def test_unchanged_input(self):
+        network = self.factory.create(self.definition, incremental=True)()
+        input_ = (1, 2)
+        
+        output = [network.send(input_) for _ in range(4)]
+        
+        self.assertEqual(output, [6 + 3 / 3, 6 + 6 / 3, 6 + 9 / 3, 6 + 9 / 3])
+        self.assertEqual(self.calls, 1)
+        
+    def test_equal(self):
+        network = self.factory.create(self.definition, incremental=True, equal=eq)()
+        
+        for input_ in (3, 3.0, 3, 4, 4):
+            network.send(input_)
+        
+        self.assertEqual(self.calls, 2)
+        
+    def test_without_equal(self):
+        network = self.factory.create(self.definition, incremental=True)()
+        
+        for input_ in (3, 3.0, 3, 4, 4):
+            network.send(input_)
+        
+        #Only the second 4 is the previous input object
+        self.assertEqual(self.calls, 4)
+        
+    def test_output_updated_in_place(self):
+        definition = NetworkDefinition(self.channels.keys())
+        for module_id, channel_type in (("in", "sum"), ("buffer", "buffer"), ("out", "first")):
+            definition.add_module(module_id, channel_type)
+        definition.add_connection("in", "buffer")
+        definition.add_connection("buffer", "out")
+        network = self.factory.create(definition, incremental=True, equal=eq)()
+        
+        self.assertEqual([network.send(input_) for input_ in (1, 2, 2, 3)], [1, 2, 2, 3])
+        
+    def test_unchanged_bool(self):
+        definition = NetworkDefinition(self.channels.keys())
+        for module_id, channel_type in (("in", "sum"), ("positive", "positive"), ("double", "double")):
+            definition.add_module(module_id, channel_type)
+        definition.add_connection("in", "positive")
+        definition.add_connection("positive", "double")
+        network = self.factory.create(definition, incremental=True, equal=eq)()
+        
+        output = [network.send(input_) for input_ in (1, 2, 3, 4, 5)]
+        
+        self.assertEqual(output, [2] * 5)
+        self.assertEqual(self.calls, 1)
+        
+    def test_restore(self):
+        network = self.factory.create(self.definition, incremental=True)()
+        input_ = (1, 2)
+        network.send(input_)
+        state = snapshot(network)
+        restored = self.factory.create(self.definition, incremental=True)()
+        restored.send((5, 5))
+        
+        restore(restored, state)
+        
+        self.assertEqual(restored.send(input_), network.send(input_))
+        
+    def test_selected_output_blocks(self):
+        definition = create_numeric_definition(NUMERIC_CHANNELS.keys())
+        inputs = [0.1, 7, 7, (2, 3.5), 1e6, 1e6, -3, 0.3]
+        reference = self.factory.create(definition, outputs=("average", "inverse"))()
+        expected = [list(block) for block in send_many(reference, inputs)]
+        
+        network = self.factory.create(definition, outputs=("average", "inverse"), incremental=True, equal=eq)()
+        averages, inverses = send_many(network, inputs)
+        
+        self.assertEqual([averages, inverses], expected)
+        
+    def test_with_lazy(self):
+        self.assertRaises(ValueError, self.factory.create, self.definition, lazy=True, incremental=True)
+
+class CachedNetworkTestCase(TestCase):
+    def setUp(self):
+        self.channels = {"sum": sum_channel, "reverse": reverse_channel, "delay": delay_channel}
+        self.factory = NetworkFactory(self.channels)
+        self.inputs = ["one", "two", "one", "one", "three", "two"]
+        
+    def __definition(self, cache_size=None):
+        definition = NetworkDefinition(self.factory.available_channel_types())
+        definition.add_module("in", "sum")
+        definition.add_module("reverse", "reverse", cache_size=cache_size)
+        definition.add_module("delay", "delay")
+        definition.add_connection("in", "reverse")
+        definition.add_connection("reverse", "delay")
+        
+        return definition
+        
+    def test_outputs(self):
+        reference = self.factory.create(self.__definition())()
+        network = self.factory.create(self.__definition(2))()
+        
+        self.assertEqual([network.send(input_) for input_ in self.inputs],
+                         [reference.send(input_) for input_ in self.inputs])
+        
+    def test_cache_info(self):
+        network = self.factory.create(self.__definition(2))()
+        for input_ in self.inputs:
+            network.send(input_)
+        
+        self.assertEqual(network.cache_info(), {"reverse": CacheInfo(2, 4, 2, 2)})
+        
+    def test_nested(self):
+        self.factory.define_channel_type("nested", self.__definition(2))
+        definition = NetworkDefinition(self.factory.available_channel_types())
+        definition.add_module("in", "sum")
+        definition.add_module("nested", "nested")
+        definition.add_connection("in", "nested")
+        network = self.factory.create(definition)()
+        network.send("one")
+        
+        self.assertEqual(list(network.cache_info()), [("nested", "reverse")])
+        
+    def test_not_memoryless(self):
+        definition = self.__definition()
+        definition.add_module("cached_delay", "delay", cache_size=2)
+        
+        self.assertRaises(ValueError, self.factory.create, definition)
+        
+    def test_nested_not_memoryless(self):
+        self.factory.define_channel_type("nested", self.__definition())
+        definition = NetworkDefinition(self.factory.available_channel_types())
+        definition.add_module("in", "sum")
+        definition.add_module("nested", "nested", cache_size=4)
+        definition.add_connection("in", "nested")
+        
+        self.assertRaises(ValueError, self.factory.create, definition)
+        
+    def test_size(self):
+        self.assertRaises(ValueError, self.__definition, 0)
+
+def _root(value):
+    return math.sqrt(sum(value))
+
+class ParallelNetworkTestCase(TestCase):
+    def setUp(self):
+        self.factory = NetworkFactory(NUMERIC_CHANNELS)
+        self.definition = create_numeric_definition(NUMERIC_CHANNELS.keys())
+        self.inputs = [0.1, 7, (2, 3.5), 1e6, -3, 0.3, 11, 12, 0.7]
+        
+        reference = self.factory.create(self.definition)()
+        self.expected = [reference.send(input_) for input_ in self.inputs * 2]
+        
+    def test_levels(self):
+        modules, connections = self.definition._get_state()
+        plan = compile_network([Module(module.id, None) for module in modules], connections)
+        
+        self.assertEqual(network_levels(plan), ((0, 2), (1, 3), (4, )))
+        
+    def test_thread(self):
+        self.__assert_processed("thread")
+        
+    def test_process(self):
+        self.__assert_processed("process")
+        
+    def test_process_after_error(self):
+        #The root fails for negative inputs, while the inverse in the other
+        #worker succeeds
+        channels = dict(NUMERIC_CHANNELS, root=partial(memoryless_channel, _root))
+        definition = NetworkDefinition(channels.keys())
+        definition.add_module("in", "sum")
+        definition.add_module("root", "root")
+        definition.add_module("inverse", "inverse")
+        definition.add_module("out", "average")
+        definition.add_connection("in", "root")
+        definition.add_connection("in", "inverse")
+        definition.add_connection("root", "out")
+        definition.add_connection("inverse", "out")
+        factory = NetworkFactory(channels)
+        
+        reference = factory.create(definition)()
+        self.assertRaises(ValueError, reference.send, -4)
+        expected = [reference.send(input_) for input_ in (9, 16, 4)]
+        
+        network = factory.create(definition, "process", 2)()
+        try:
+            self.assertRaises(ValueError, network.send, -4)
+            output = [network.send(input_) for input_ in (9, 16, 4)]
+        finally:
+            network.close()
+        
+        self.assertEqual(output, expected)
+        
+    def test_unknown_executor(self):
+        self.assertRaisesRegex(ValueError, "other", self.factory.create, self.definition, "other")
+        
+    def __assert_processed(self, executor):
+        network = self.factory.create(self.definition, executor, 2)()
+        try:
+            output = [network.send(input_) for input_ in self.inputs]
+            output += list(send_many(network, self.inputs))
+        finally:
+            network.close()
+        
+        self.assertEqual(output, self.expected)
+
+class NetworkPoolTestCase(TestCase):
+    def setUp(self):
+        factory = NetworkFactory(NUMERIC_CHANNELS)
+        self.network = factory.create(create_numeric_definition(NUMERIC_CHANNELS.keys()))
+        self.pool = NetworkPool(self.network, ("a", "b", "c"), 2)
+        self.inputs = {"a": [1, 2, 3, 4, 5], "b": [0.5, -1, 1e3, 7, 2], "c": [3, 3, 3, 3, 3]}
+        
+    def tearDown(self):
+        self.pool.close()
+        
+    def test_stream_ids(self):
+        self.assertEqual(self.pool.stream_ids(), ("a", "b", "c"))
+        
+    def test_send(self):
+        outputs = {stream_id: [] for stream_id in self.inputs}
+        for i in range(5):
+            for stream_id, output in self.pool.send({stream_id: inputs[i] for stream_id, inputs in self.inputs.items()}).items():
+                outputs[stream_id].append(output)
+        
+        self.assertEqual(outputs, self.__expected())
+        
+    def test_send_many(self):
+        outputs = self.pool.send_many(self.inputs)
+        
+        self.assertEqual({stream_id: list(output) for stream_id, output in outputs.items()}, self.__expected())
+        
+    def test_partial_send(self):
+        self.pool.send({"a": 1})
+        outputs = self.pool.send_many({"b": self.inputs["b"]})
+        
+        self.assertEqual(list(outputs["b"]), self.__expected()["b"])
+        
+    def test_unknown_stream(self):
+        self.assertRaises(KeyError, self.pool.send, {"d": 1})
+        
+    def test_send_after_error(self):
+        self.assertRaises(TypeError, self.pool.send, {"a": None, "b": 1})
+        outputs = self.pool.send({"a": 5, "b": 7})
+        
+        a, b = self.network(), self.network()
+        b.send(1)
+        self.assertEqual(outputs, {"a": a.send(5), "b": b.send(7)})
+        
+    def __expected(self):
+        expected = {}
+        for stream_id, inputs in self.inputs.items():
+            network = self.network()
+            expected[stream_id] = [network.send(input_) for input_ in inputs]
+        
+        return expected
+
+class ProfiledNetworkTestCase(TestCase):
+    def setUp(self):
+        self.factory = NetworkFactory(NUMERIC_CHANNELS)
+        self.definition = create_numeric_definition(NUMERIC_CHANNELS.keys())
+        self.stats = NetworkStats()
+        self.inputs = [0.1, 7, (2, 3.5), 1e6, -3, 0.3]
+        
+    def test_outputs(self):
+        reference = self.factory.create(self.definition)()
+        expected = [reference.send(input_) for input_ in self.inputs * 2]
+        
+        network = self.factory.create(self.definition, profile=self.stats)()
+        output = [network.send(input_) for input_ in self.inputs]
+        output += list(send_many(network, self.inputs))
+        
+        self.assertEqual(output, expected)
+        
+    def test_summary(self):
+        network = self.factory.create(self.definition, profile=self.stats)()
+        for input_ in self.inputs:
+            network.send(input_)
+        send_many(network, self.inputs)
+        
+        summary = self.stats.summary()
+        
+        self.assertEqual(self.stats.module_ids(), ["in", "average", "unconnected", "inverse", "out"])
+        self.assertEqual(summary["out"]["fan_in"], 3)
+        self.assertEqual(summary["in"]["calls"], 7)
+        self.assertEqual(summary["in"]["inputs"], 12)
+        self.assertGreater(summary["out"]["total_time"], 0)
+        self.assertGreaterEqual(summary["out"]["p99"], summary["out"]["p50"])
+        
+    def test_dump(self):
+        network = self.factory.create(self.definition, profile=self.stats)()
+        network.send(1)
+        output = StringIO()
+        
+        self.stats.dump(output)
+        
+        self.assertEqual(json.loads(output.getvalue())["inverse"]["calls"], 1)
+        
+    def test_with_executor(self):
+        self.assertRaises(ValueError, self.factory.create, self.definition, "thread", profile=self.stats)
+
+class PrunedNetworkTestCase(TestCase):
+    def setUp(self):
+        self.factory = NetworkFactory(NUMERIC_CHANNELS)
+        self.definition = create_numeric_definition(NUMERIC_CHANNELS.keys())
+        self.definition.add_module("diagnostic", "long_average")
+        self.definition.add_module("result", "average")
+        self.definition.add_connection("in", "diagnostic")
+        self.definition.add_connection("inverse", "result")
+        self.inputs = [0.1, 7, (2, 3.5), 1e6, -3, 0.3]
+        
+        reference = self.factory.create(self.definition)()
+        self.expected = [reference.send(input_) for input_ in self.inputs * 2]
+        
+    def test_outputs(self):
+        network = self.factory.create(self.definition, prune=True)()
+        output = [network.send(input_) for input_ in self.inputs]
+        output += list(send_many(network, self.inputs))
+        
+        self.assertEqual(output, self.expected)
+        
+    def test_pruned_modules(self):
+        stats = NetworkStats()
+        self.factory.create(self.definition, profile=stats, prune=True)()
+        
+        self.assertEqual(stats.module_ids(), ["in", "inverse", "result"])
+        
+    def test_keep(self):
+        stats = NetworkStats()
+        self.factory.create(self.definition, profile=stats, prune=True, keep=("diagnostic", ))()
+        
+        self.assertEqual(stats.module_ids(), ["in", "inverse", "diagnostic", "result"])
+        
+    def test_keep_nested(self):
+        self.factory.define_channel_type("nested", create_numeric_definition(NUMERIC_CHANNELS.keys()))
+        definition = NetworkDefinition(self.factory.available_channel_types())
+        definition.add_module("in", "sum")
+        definition.add_module("nested", "nested")
+        definition.add_module("out", "sum")
+        definition.add_connection("in", "nested")
+        stats = NetworkStats()
+        
+        self.factory.create(definition, profile=stats, prune=True, keep=("nested", ))()
+        
+        self.assertEqual(len(stats.module_ids()), 7)
+        
+    def test_keep_undefined(self):
+        self.assertRaises(UndefinedNameError, self.factory.create, self.definition, prune=True, keep=("missing", ))
+        
+    def test_not_pruned(self):
+        stats = NetworkStats()
+        self.factory.create(self.definition, profile=stats)()
+        
+        self.assertEqual(len(stats.module_ids()), 7)
+
+class OutputsNetworkTestCase(TestCase):
+    def setUp(self):
+        self.factory = NetworkFactory(NUMERIC_CHANNELS)
+        self.definition = create_numeric_definition(NUMERIC_CHANNELS.keys())
+        self.inputs = [0.1, 7, (2, 3.5), 1e6, -3, 0.3]
+        
+    def __reference(self, module_id):
+        definition = create_numeric_definition(NUMERIC_CHANNELS.keys())
+        definition.add_module("tap", "sum")
+        definition.add_connection(module_id, "tap")
+        reference = self.factory.create(definition)()
+        
+        return [reference.send(input_) for input_ in self.inputs * 2]
+        
+    def test_outputs(self):
+        network = self.factory.create(self.definition, outputs=("inverse", "out"))()
+        output = [network.send(input_) for input_ in self.inputs]
+        
+        self.assertEqual(output, list(zip(self.__reference("inverse"), self.__reference("out")))[:len(self.inputs)])
+        
+    def test_send_many(self):
+        network = self.factory.create(self.definition, outputs=("average", "out"))()
+        send_many(network, self.inputs)
+        
+        averages, outs = send_many(network, self.inputs)
+        
+        self.assertEqual(list(averages), self.__reference("average")[len(self.inputs):])
+        self.assertEqual(list(outs), self.__reference("out")[len(self.inputs):])
+        
+    def test_threaded(self):
+        network = self.factory.create(self.definition, "thread", outputs=("average", "out"))()
+        try:
+            output = [network.send(input_) for input_ in self.inputs]
+        finally:
+            network.close()
+        
+        self.assertEqual(output, list(zip(self.__reference("average"), self.__reference("out")))[:len(self.inputs)])
+        
+    def test_nested(self):
+        self.factory.define_channel_type("nested", create_numeric_definition(NUMERIC_CHANNELS.keys()))
+        definition = NetworkDefinition(self.factory.available_channel_types())
+        definition.add_module("in", "sum")
+        definition.add_module("nested", "nested")
+        definition.add_module("out", "inverse")
+        definition.add_connection("in", "nested")
+        definition.add_connection("nested", "out")
+        
+        network = self.factory.create(definition, outputs=("nested", ))()
+        
+        self.assertEqual([network.send(input_)[0] for input_ in self.inputs], self.__reference("out")[:len(self.inputs)])
+        
+    def test_pruned(self):
+        stats = NetworkStats()
+        self.factory.create(self.definition, profile=stats, prune=True, outputs=("average", ))()
+        
+        self.assertEqual(stats.module_ids(), ["in", "average"])
+        
+    def test_undefined(self):
+        self.assertRaises(UndefinedNameError, self.factory.create, self.definition, outputs=("missing", ))
+
+class MergedNetworkTestCase(TestCase):
+    def setUp(self):
+        self.channels = dict(NUMERIC_CHANNELS, counter=lambda: numeric_channels.moving_average_channel(2))
+        self.factory = NetworkFactory(self.channels)
+        self.definition = NetworkDefinition(self.channels.keys())
+        for module_id, channel_type in (("in", "sum"), ("one", "average"), ("two", "average"), ("three", "inverse"),
+                                        ("four", "inverse"), ("five", "counter"), ("six", "counter"), ("out", "sum")):
+            self.definition.add_module(module_id, channel_type)
+        for from_module, to_module in (("in", "one"), ("in", "two"), ("one", "three"), ("two", "four"),
+                                       ("in", "five"), ("in", "six")):
+            self.definition.add_connection(from_module, to_module)
+        for module_id in ("three", "four", "five", "six"):
+            self.definition.add_connection(module_id, "out")
+        self.inputs = [0.1, 7, (2, 3.5), 1e6, -3, 0.3]
+        
+    def test_outputs(self):
+        reference = self.factory.create(self.definition)()
+        expected = [reference.send(input_) for input_ in self.inputs * 2]
+        
+        network = self.factory.create(self.definition, merge=True)()
+        output = [network.send(input_) for input_ in self.inputs]
+        output += list(send_many(network, self.inputs))
+        
+        self.assertEqual(output, expected)
+        
+    def test_deterministic(self):
+        self.assertTrue(is_deterministic(self.channels["average"]))
+        self.assertFalse(is_deterministic(self.channels["counter"]))
+        
+    def test_merged_modules(self):
+        stats = NetworkStats()
+        self.factory.create(self.definition, profile=stats, merge=True)()
+        
+        self.assertEqual(stats.module_ids(), ["in", "one", "three", "five", "six", "out"])
+        self.assertEqual(stats.summary()["out"]["fan_in"], 4)
+        
+    def test_outputs_of_merged_modules(self):
+        network = self.factory.create(self.definition, outputs=("three", "four"), merge=True)()
+        
+        for input_ in self.inputs:
+            three, four = network.send(input_)
+            self.assertEqual(three, four)
+            
+    def test_keep_last_module(self):
+        self.definition.add_module("last", "sum")
+        self.definition.add_connection("out", "last")
+        stats = NetworkStats()
+        self.factory.create(self.definition, profile=stats, merge=True)()
+        
+        self.assertEqual(stats.module_ids()[-1], "last")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,10 +1,13 @@
-from ..numeric_channels import sum_channel, inverse_channel, moving_average_channel
+import math
+from ..numeric_channels import sum_channel, inverse_channel, moving_average_channel, process_stream
 from unittest import TestCase, main
 from .base import ChannelTestCase, NoInputTestCase,\
-    MemorylessTestCase
+    MemorylessTestCase, BlockTestCase, SnapshotTestCase
 
-class SumTestCase(TestCase, ChannelTestCase, NoInputTestCase, MemorylessTestCase):
+class SumTestCase(TestCase, ChannelTestCase, NoInputTestCase, MemorylessTestCase, BlockTestCase):
     def setUp(self):
+        self.create_channel = sum_channel
+        self.block_input = [1, (2, 3), (), (4, 5, 6)]
         self.channel = sum_channel()
         self.single_input = 1
         self.tuple_input = (1, 2, 3)
@@ -23,8 +26,10 @@ class InverseTestCase(TestCase, ChannelTestCase, NoInputTestCase, MemorylessTest
         self.expected_no_input = 0
         self.empty_val = 0
 
-class MovingAverageTestCase(TestCase, ChannelTestCase, NoInputTestCase):
+class MovingAverageTestCase(TestCase, ChannelTestCase, NoInputTestCase, BlockTestCase, SnapshotTestCase):
     def setUp(self):
+        self.create_channel = lambda: moving_average_channel(4, (1, 2))
+        self.block_input = [0.1, 7, (2, 3.5), 1e6, -3, 0.3, 11, 12]
         self.channel = moving_average_channel(4)
         self.single_input = 8
         self.tuple_input = (1, 2, 3, 4, 5, 5) # sum = 20
@@ -42,6 +47,24 @@ class MovingAverageTestCase(TestCase, ChannelTestCase, NoInputTestCase):
 
         self.assertSequenceEqual(expected, all_averages)
 
+class StableMovingAverageTestCase(MovingAverageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.create_channel = lambda: moving_average_channel(4, (1, 2), stable=True)
+        self.channel = moving_average_channel(4, stable=True)
+        
+    def test_no_drift(self):
+        inputs = [1e9 + 0.1 * (i % 7) for i in range(10000)] + [0.1, 0.2, 0.3, 0.4]
+        
+        averages = [self.channel.send(input_) for input_ in inputs]
+        
+        self.assertEqual(averages[-1], math.fsum(inputs[-4:]) / 4)
+
+class ProcessStreamTestCase(TestCase):
+    def test_process_stream(self):
+        chunks = list(process_stream(moving_average_channel(2), range(4, 13, 4), chunk_size=2, flush=2))
+        
+        self.assertEqual([list(chunk) for chunk in chunks], [[2, 6], [10, 6], [0]])
 
 #class HelperFunctionsTestCase(TestCase):
 #    def test_None_values(self):
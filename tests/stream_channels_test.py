@@ -0,0 +1,53 @@
+from ..stream_channels import moving_average_channel, shift_channel
+from .. import numeric_channels, channels
+from .base import BlockTestCase, SnapshotTestCase
+from unittest import TestCase, main
+import numpy as np
+from numpy.testing import assert_array_equal
+
+class StreamTestCase(BlockTestCase, SnapshotTestCase):
+    def test_streams(self):
+        streams = [self.create_stream_channel(k) for k in range(len(self.block_input[0]))]
+        expected = [[stream.send(value) for stream, value in zip(streams, input_)] for input_ in self.block_input]
+        
+        channel = self.create_channel()
+        output = [channel.send(input_) for input_ in self.block_input]
+        
+        assert_array_equal(output, expected)
+
+class MovingAverageTestCase(TestCase, StreamTestCase):
+    def setUp(self):
+        self.create_channel = lambda: moving_average_channel(3, 4, (1, (2, 3, 4)))
+        self.create_stream_channel = lambda k: numeric_channels.moving_average_channel(4, (1, (2, 3, 4)[k]))
+        self.block_input = [(1, 2, 3), (0.5, 0.25, 1e6), (4, 5, 6), (7, 8, 9), (-1, -2, -3), (0, 0, 0)]
+        
+    def test_out(self):
+        out = np.empty(2)
+        channel = moving_average_channel(2, 2, out=out)
+        
+        self.assertIs(channel.send((2, 4)), out)
+        assert_array_equal(out, (1, 2))
+        
+class StableMovingAverageTestCase(MovingAverageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.create_channel = lambda: moving_average_channel(3, 4, (1, (2, 3, 4)), stable=True)
+        self.create_stream_channel = lambda k: numeric_channels.moving_average_channel(4, (1, (2, 3, 4)[k]), stable=True)
+
+class ShiftTestCase(TestCase, StreamTestCase):
+    def setUp(self):
+        self.create_channel = lambda: shift_channel(3, 2, ((7, 8, 9), ), zero_val=-1)
+        self.create_stream_channel = lambda k: channels.shift_channel(2, ((7, 8, 9)[k], ), zero_val=-1)
+        self.block_input = [(1, 2, 3), (0.5, 0.25, 1e6), (4, 5, 6), (7, 8, 9), (-1, -2, -3), (0, 0, 0)]
+        
+    def test_too_many_initial_values(self):
+        self.assertRaises(ValueError, shift_channel, 3, 1, (1, 2))
+
+class ScalarShiftTestCase(ShiftTestCase):
+    def setUp(self):
+        super().setUp()
+        self.create_channel = lambda: shift_channel(3, 3, (1, 2), zero_val=-1)
+        self.create_stream_channel = lambda k: channels.shift_channel(3, (1, 2), zero_val=-1)
+
+if __name__ == "__main__":
+    main()
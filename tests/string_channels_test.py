@@ -1,9 +1,9 @@
 from itertools import islice, chain
 from ..string_channels import echo_channel, reverse_channel, \
-    delay_channel, DELAY_INITIAL, process_sequence, sum_channel
+    delay_channel, DELAY_INITIAL, process_sequence, process_stream, sum_channel
 from unittest import TestCase, main
 from .base import ChannelTestCase, NoInputTestCase,\
-    MemorylessTestCase
+    MemorylessTestCase, BlockTestCase, SnapshotTestCase
 from ..channels import memoryless_channel
 
 class SumTestCase(TestCase, ChannelTestCase, NoInputTestCase, MemorylessTestCase):
@@ -36,8 +36,10 @@ class ReverseTestCase(TestCase, ChannelTestCase, NoInputTestCase, MemorylessTest
         self.expected_no_input = ""
         self.empty_val = ""
 
-class DelayTestCase(TestCase, ChannelTestCase):
+class DelayTestCase(TestCase, ChannelTestCase, BlockTestCase, SnapshotTestCase):
     def setUp(self):
+        self.create_channel = delay_channel
+        self.block_input = ["one", ("t", "w", "o"), "", "three"]
         self.channel = delay_channel()
         self.single_input = "test"
         self.tuple_input = ("one", "two", "three")
@@ -63,6 +65,59 @@ class DelayTestCase(TestCase, ChannelTestCase):
             output = self.channel.send(input_value)
             self.assertEqual(output, expected_output)
 
+class MaxLengthTestCase(TestCase):
+    def test_sum(self):
+        output = sum_channel(5).send(("one", "two", "three"))
+        
+        self.assertEqual(output, "onetw")
+        
+    def test_sum_stops_at_max_length(self):
+        def inputs():
+            yield "one"
+            yield "two"
+            raise AssertionError("Input read beyond the maximum length")
+        
+        self.assertEqual(sum_channel(6).send(inputs()), "onetwo")
+        
+    def test_default(self):
+        output = sum_channel().send(("a" * 6000, "b" * 6000))
+        
+        self.assertEqual(output, "a" * 6000 + "b" * 4000)
+        
+    def test_echo(self):
+        self.assertEqual(echo_channel(5).send("one"), "oneon")
+        self.assertEqual(echo_channel(2).send("one"), "on")
+        
+    def test_reverse(self):
+        self.assertEqual(reverse_channel(4).send(("one", "two")), "teno")
+        
+    def test_delay(self):
+        channel = delay_channel(3)
+        channel.send(("one", "two"))
+        
+        self.assertEqual(channel.send(""), "one")
+
+class BytesTestCase(TestCase):
+    def test_sum(self):
+        output = sum_channel().send((b"one", bytearray(b"two"), memoryview(b"three")))
+        
+        self.assertEqual(output, b"onetwothree")
+        
+    def test_single(self):
+        self.assertEqual(sum_channel(4).send(memoryview(b"three")), b"thre")
+        self.assertEqual(sum_channel().send(bytearray(b"one")), b"one")
+        
+    def test_max_length(self):
+        output = sum_channel(5).send((b"one", memoryview(b"two"), b"three"))
+        
+        self.assertEqual(output, b"onetw")
+        
+    def test_echo(self):
+        self.assertEqual(echo_channel().send((b"one", b"two")), b"onetwoonetwo")
+        
+    def test_reverse(self):
+        self.assertEqual(reverse_channel().send(bytearray(b"one")), b"eno")
+
 class HelperFunctionsTestCase(TestCase):
     def test_None_values(self):
         channel = memoryless_channel()
@@ -98,5 +153,25 @@ class HelperFunctionsTestCase(TestCase):
         
         self.assertCountEqual(first_ten_outputs, expected)
 
+class ProcessStreamTestCase(TestCase):
+    def test_process_stream(self):
+        inputs = iter(("one", "two", "three"))
+        
+        chunks = list(process_stream(delay_channel(), inputs, chunk_size=3, flush=1))
+        
+        self.assertEqual(chunks, [[DELAY_INITIAL, "one", "two"], ["three"]])
+        
+    def test_none_values(self):
+        chunks = process_stream(memoryless_channel(), ("one", None, "three"), chunk_size=2)
+        
+        self.assertEqual(list(chunks), [["one", ""], ["three"]])
+        
+    def test_empty(self):
+        self.assertEqual(list(process_stream(delay_channel(), ())), [])
+        
+    def test_chunk_size(self):
+        for chunk_size in (0, -1):
+            self.assertRaises(ValueError, process_stream, delay_channel(), ("one", ), chunk_size)
+
 if __name__ == "__main__":
     main()    